@@ -1,9 +1,18 @@
 import streamlit as st
 import requests
 import pandas as pd
-import plotly.express as px
 import numpy as np
-import pyarrow
+
+from vendas import graficos
+from vendas.cache import em_cache, orcamento_ambiente
+from vendas.instrumentacao import iniciar_execucao, medir, medir_cache, registrar_tamanho
+from vendas.cliente import URL_LABDADOS
+from vendas.filtros import REGIOES, assinatura_filtros
+from vendas.materializacao import ler_tabelas
+from vendas.normalizacao import COLUNAS_COORDENADAS
+from vendas.painel import debug_ativo, finalizar_com_painel, interromper_com_painel
+from vendas.repositorio import obter_repositorio
+from vendas.tabela import tabela_paginada
 
 # ====================================================================
 # CONFIG PLOTLY (apenas chaves válidas do config)
@@ -15,7 +24,10 @@ CONFIG_PLOTLY = {
 
 def show_chart(fig):
     # NENHUM outro kwargs aqui, só config
-    st.plotly_chart(fig, config=CONFIG_PLOTLY)
+    with medir('plotly_chart'):
+        st.plotly_chart(fig, config=CONFIG_PLOTLY)
+    if debug_ativo():
+        registrar_tamanho('figuras', len(fig.to_json()))
 
 # ====================================================================
 # CONFIGURAÇÃO GERAL
@@ -24,6 +36,7 @@ st.set_page_config(
     page_title='DASHBOARD - ERICK',
     layout='wide'
 )
+iniciar_execucao('dashboard')
 
 # ====================================================================
 # AJUSTE PARA TELA NO TOPO
@@ -45,7 +58,7 @@ st.markdown(
 # ====================================================================
 # URL GLOBAL
 # ====================================================================
-url = 'https://labdados.com/produtos'
+url = URL_LABDADOS
 
 # ====================================================================
 # FUNÇÃO DE FORMATAÇÃO
@@ -60,10 +73,12 @@ def formata_numero(valor, prefixo=''):
     return f'{prefixo} {valor:.2f} milhões'
 
 # ====================================================================
-# TELA DE CARREGAMENTO  mostra só na 1ª vez
+# TELA DE CARREGAMENTO  mostra só enquanto o processo não tem os dados
 # ====================================================================
+repositorio = obter_repositorio(url)
+
 placeholder = None
-if 'dados_brutos' not in st.session_state:
+if not repositorio.carregado:
     placeholder = st.empty()
     with placeholder.container():
         st.markdown(
@@ -88,27 +103,16 @@ if 'dados_brutos' not in st.session_state:
         )
 
 # ====================================================================
-# CARREGAMENTO DE DADOS  usa cache e mantém na sessão
+# CARREGAMENTO DE DADOS  base única compartilhada por todas as sessões
 # ====================================================================
-@st.cache_data(ttl=600, show_spinner=False)
-def carregar_dados_brutos(api_url):
-    try:
-        response = requests.get(api_url, timeout=15)
-        response.raise_for_status()
-        df = pd.DataFrame.from_dict(response.json())
-        df['Data da Compra'] = pd.to_datetime(df['Data da Compra'], format='%d/%m/%Y')
-        return df
-    except requests.exceptions.RequestException as e:
-        st.error(f"Erro de Conexão {e}")
-        return None
-
-if 'dados_brutos' in st.session_state and isinstance(st.session_state['dados_brutos'], pd.DataFrame):
-    dados_brutos = st.session_state['dados_brutos']
-else:
-    dados_brutos = carregar_dados_brutos(url)
-    if dados_brutos is None:
-        st.stop()
-    st.session_state['dados_brutos'] = dados_brutos
+try:
+    with medir('carregar_dados'):
+        base_vendas = repositorio.obter()
+except requests.exceptions.RequestException as e:
+    st.error(f"Erro de Conexão {e}")
+    interromper_com_painel()
+
+dados_brutos = base_vendas.dados
 
 if placeholder is not None:
     placeholder.empty()
@@ -117,9 +121,9 @@ if placeholder is not None:
 # FILTROS
 # ====================================================================
 st.title('DASHBOARD DE VENDAS :shopping_cart:')
-regioes = ['Brasil', 'Centro-Oeste', 'Nordeste', 'Sudeste', 'Sul']
-anos_disponiveis = sorted(dados_brutos['Data da Compra'].dt.year.unique().tolist())
-anos_disponiveis_str = [str(a) for a in anos_disponiveis]
+regioes = REGIOES
+# opções calculadas uma vez por versão dos dados, sem varrer as linhas
+anos_disponiveis_str = base_vendas.anos
 
 st.sidebar.title('Filtros')
 
@@ -128,7 +132,7 @@ with st.sidebar.expander('Região'):
     regiao = '' if data_regiao == 'Brasil' else data_regiao
 
 with st.sidebar.expander('Vendedores'):
-    opcoes_vendedores = ['Todos'] + sorted(dados_brutos['Vendedor'].unique().tolist())
+    opcoes_vendedores = ['Todos'] + base_vendas.vendedores
     vendedor_selecionado = st.multiselect('Selecione os vendedores', opcoes_vendedores, default=['Todos'])
     filtro_vendedores = [] if 'Todos' in vendedor_selecionado or not vendedor_selecionado else vendedor_selecionado
 
@@ -138,264 +142,137 @@ with st.sidebar.expander('Período'):
         anos_disponiveis_str,
         default=anos_disponiveis_str
     )
-    ano_param = ",".join(filtro_anos) if filtro_anos else ''
-
-# ====================================================================
-# REQUISIÇÃO FILTRADA
-# ====================================================================
-query_string = {'regiao': regiao.lower(), 'ano': ano_param}
-response = requests.get(url, params=query_string)
-
-if response.status_code == 200:
-    dados = pd.DataFrame.from_dict(response.json())
-    dados['Data da Compra'] = pd.to_datetime(dados['Data da Compra'], format='%d/%m/%Y')
-else:
-    st.error(f"Erro ao carregar dados. Código: {response.status_code}")
-    dados = pd.DataFrame()
-
-if filtro_vendedores:
-    dados = dados[dados['Vendedor'].isin(filtro_vendedores)]
-
-if dados.empty:
-    st.warning('Nenhum dado encontrado com os filtros selecionados.')
-    st.stop()
 
 # ====================================================================
 # AGRUPAMENTO E GRÁFICOS
 # ====================================================================
-@st.cache_data
-def criar_tabelas_e_graficos(dados_filtrados):
-    if dados_filtrados.empty:
-        return (
-            pd.DataFrame(), pd.DataFrame(),
-            None, None, None, None,
-            None, None, None, None,
-        )
-
-    receita_estados = dados_filtrados.groupby('Local da compra')['Preço'].sum()
-    receita_estados = (
-        dados_filtrados.drop_duplicates(subset='Local da compra')[['Local da compra', 'lat', 'lon']]
-        .merge(receita_estados, left_on='Local da compra', right_index=True)
-        .sort_values('Preço', ascending=False)
-    )
-
-    receita_mensal = (
-        dados_filtrados.set_index('Data da Compra')
-        .groupby(pd.Grouper(freq='ME'))['Preço'].sum()
-        .reset_index()
-    )
-    receita_mensal['Ano'] = receita_mensal['Data da Compra'].dt.year
-    receita_mensal['Mes'] = receita_mensal['Data da Compra'].dt.month_name()
-
-    receita_categorias = (
-        dados_filtrados.groupby('Categoria do Produto')[['Preço']].sum()
-        .sort_values('Preço', ascending=False)
-    )
-
-    vendas_estados = dados_filtrados.groupby('Local da compra').size().reset_index(name='Contagem')
-    vendas_estados = (
-        dados_filtrados.drop_duplicates(subset='Local da compra')[['Local da compra', 'lat', 'lon']]
-        .merge(vendas_estados, on='Local da compra')
-        .sort_values('Contagem', ascending=False)
-    )
-
-    vendas_mensal = (
-        dados_filtrados.set_index('Data da Compra')
-        .groupby(pd.Grouper(freq='ME')).size()
-        .reset_index(name='Contagem')
-    )
-    vendas_mensal['Ano'] = vendas_mensal['Data da Compra'].dt.year
-    vendas_mensal['Mes'] = vendas_mensal['Data da Compra'].dt.month_name()
-
-    vendas_categorias = (
-        dados_filtrados.groupby('Categoria do Produto').size()
-        .reset_index(name='Contagem')
-        .sort_values('Contagem', ascending=False)
-    )
-
-    vendedores = pd.DataFrame(
-        dados_filtrados.groupby('Vendedor')['Preço'].agg(['sum', 'count'])
-    )
-
-    RECEITA_MIN = receita_mensal['Preço'].min()
-    RECEITA_MAX = receita_mensal['Preço'].max()
-    VENDAS_MIN = vendas_mensal['Contagem'].min()
-    VENDAS_MAX = vendas_mensal['Contagem'].max()
-
-    fig_mapa_receita = px.scatter_geo(
-        receita_estados,
-        lat='lat', lon='lon', scope='south america', size='Preço', template='seaborn',
-        hover_name='Local da compra', hover_data={'lat': False, 'lon': False},
-        title='Receita por Estado',
-    )
-    fig_receita_mensal = px.line(
-        receita_mensal, x='Mes', y='Preço', markers=True,
-        range_y=(RECEITA_MIN * 0.9, RECEITA_MAX * 1.1), color='Ano', line_dash='Ano',
-        title='Receita Mensal',
-    )
-    fig_receita_mensal.update_layout(yaxis_title='Receita')
-    fig_receita_estados = px.bar(
-        receita_estados.head(), x='Local da compra', y='Preço', text_auto=True,
-        title='Top Estados Receita',
-    )
-    fig_receita_estados.update_layout(yaxis_title='Receita')
-    fig_receitas_categorias = px.bar(
-        receita_categorias, text_auto=True, title='Receita por Categorias',
-    )
-    fig_receitas_categorias.update_layout(yaxis_title='Receita')
+# O cache é indexado só pela assinatura dos filtros (região, anos, vendedores
+# e versão dos dados); a base começa com '_' e fica fora da chave. Tabelas e
+# figuras ficam em caches com orçamento em bytes (vendas.cache): cada
+# combinação de filtros nova ocupa memória só até ser a menos usada quando o
+# orçamento acaba, e o mesmo objeto é reaproveitado sem cópia a cada rerun.
+# Antes de calcular, procura o resultado gravado por vendas.materializacao.
+@em_cache('tabelas', orcamento_ambiente('DASHBOARD_CACHE_TABELAS_MB', 64))
+def criar_tabelas(_base, assinatura):
+    with medir('agregados_materializados'):
+        tabelas = ler_tabelas(_base.versao, assinatura)
+    if tabelas is not None:
+        return tabelas
+    return graficos.criar_tabelas(_base, assinatura)
+
+FIGURAS_POR_ABA = {
+    'receita': graficos.graficos_receita,
+    'quantidade': graficos.graficos_quantidade,
+}
 
-    fig_mapa_vendas = px.scatter_geo(
-        vendas_estados,
-        lat='lat', lon='lon', scope='south america', size='Contagem', template='seaborn',
-        hover_name='Local da compra', hover_data={'lat': False, 'lon': False},
-        title='Quantidade de Vendas por Estado',
-    )
-    fig_vendas_mensal = px.line(
-        vendas_mensal, x='Mes', y='Contagem', markers=True,
-        range_y=((VENDAS_MIN - 20), VENDAS_MAX + 20), color='Ano', line_dash='Ano',
-        title='Quantidade de Vendas Mensais',
-    )
-    fig_vendas_mensal.update_layout(yaxis_title='Quantidade de Vendas')
-    fig_vendas_estados = px.bar(
-        vendas_estados.head(), x='Local da compra', y='Contagem', text_auto=True,
-        title='Top Estados Quantidade de Vendas',
-    )
-    fig_vendas_estados.update_layout(yaxis_title='Quantidade de Vendas')
-    fig_vendas_categorias = px.bar(
-        vendas_categorias, x='Contagem', y='Categoria do Produto', text_auto=True,
-        title='Quantidade de Vendas por Categoria',
-    )
-    fig_vendas_categorias.update_layout(xaxis_title='Quantidade de Vendas', yaxis_title='Categoria')
+@em_cache('figuras', orcamento_ambiente('DASHBOARD_CACHE_FIGURAS_MB', 32))
+def figuras_da_aba(_tabelas, assinatura, aba):
+    return FIGURAS_POR_ABA[aba](_tabelas)
 
-    return (
-        dados_filtrados, vendedores,
-        fig_mapa_receita, fig_receita_mensal, fig_receita_estados, fig_receitas_categorias,
-        fig_mapa_vendas, fig_vendas_mensal, fig_vendas_estados, fig_vendas_categorias,
-    )
+@em_cache('figuras', orcamento_ambiente('DASHBOARD_CACHE_FIGURAS_MB', 32))
+def figuras_vendedores(_vendedores, assinatura, qtd_vendedores):
+    return graficos.graficos_vendedores(_vendedores, qtd_vendedores)
 
 # Executa os cálculos com cache
-dados_final, vendedores, fig_mapa_receita, fig_receita_mensal, fig_receita_estados, fig_receitas_categorias, fig_mapa_vendas, fig_vendas_mensal, fig_vendas_estados, fig_vendas_categorias = criar_tabelas_e_graficos(dados)
+assinatura = assinatura_filtros(regiao, filtro_anos, filtro_vendedores, base_vendas.versao)
+with medir_cache('criar_tabelas'):
+    tabelas = criar_tabelas(base_vendas, assinatura)
+
+if not tabelas:
+    st.warning('Nenhum dado encontrado com os filtros selecionados.')
+    interromper_com_painel()
 
 # ====================================================================
 # MÉTRICAS DINÂMICAS GERAIS
 # ====================================================================
-qtd_operadores = int(dados_final['Vendedor'].nunique()) if 'Vendedor' in dados_final.columns else 0
-media_avaliacao = float(dados_final['Avaliação da compra'].mean()) if 'Avaliação da compra' in dados_final.columns else float('nan')
+metricas = tabelas['metricas']
+qtd_operadores = metricas.get('operadores', 0)
+media_avaliacao = metricas.get('media_avaliacao', float('nan'))
+
+def mostrar_metricas():
+    m1, m2, m3, m4 = st.columns(4)
+    with m1:
+        st.metric('Receita Total', formata_numero(metricas['receita'], 'R$'))
+    with m2:
+        st.metric('Quantidade de Vendas', formata_numero(metricas['vendas']))
+    with m3:
+        st.metric('Quantidade de Operadores', f'{qtd_operadores}')
+    with m4:
+        st.metric('Média Avaliação da compra', f"{media_avaliacao:.2f}" if not np.isnan(media_avaliacao) else 'Sem dados')
+
+def mostrar_aba_graficos(aba):
+    mostrar_metricas()
+    with medir_cache(f'figuras_{aba}'):
+        fig_mapa, fig_mensal, fig_estados, fig_categorias = figuras_da_aba(tabelas, assinatura, aba)
+
+    c1, c2 = st.columns(2)
+    with c1:
+        show_chart(fig_mapa)
+        show_chart(fig_estados)
+    with c2:
+        show_chart(fig_mensal)
+        show_chart(fig_categorias)
+
+# O número de vendedores só refaz este fragmento, não o script inteiro
+@st.fragment
+def mostrar_aba_vendedores():
+    qtd_vendedores = st.number_input('Quantidade de vendedores', 2, 10, 5)
+    mostrar_metricas()
+
+    c1, c2 = st.columns(2)
+    with medir_cache('figuras_vendedores'):
+        fig_receita_vendedores, fig_vendas_vendedores = figuras_vendedores(tabelas['vendedores'], assinatura, qtd_vendedores)
+
+    # Receita por vendedor
+    with c1:
+        show_chart(fig_receita_vendedores)
+
+    # Quantidade com média escrita ao final da mesma barra
+    with c2:
+        show_chart(fig_vendas_vendedores)
 
 # ====================================================================
 # VISUALIZAÇÃO
 # ====================================================================
-if not dados_final.empty:
-    aba1, aba2, aba3, aba4 = st.tabs(['Receita', 'Quantidade de Vendas', 'Vendedores', 'Data Frame'])
+# on_change='rerun' torna as abas preguiçosas: só a aba aberta é executada
+# e só os gráficos dela são montados e enviados ao navegador.
+aba1, aba2, aba3, aba4 = st.tabs(
+    ['Receita', 'Quantidade de Vendas', 'Vendedores', 'Data Frame'],
+    key='aba_dashboard',
+    on_change='rerun',
+)
 
-    # ---------------------------------------------------------------
-    # ABA 1 - RECEITA
-    # ---------------------------------------------------------------
+# ---------------------------------------------------------------
+# ABA 1 - RECEITA
+# ---------------------------------------------------------------
+if aba1.open:
     with aba1:
-        m1, m2, m3, m4 = st.columns(4)
-        with m1:
-            st.metric('Receita Total', formata_numero(dados_final['Preço'].sum(), 'R$'))
-        with m2:
-            st.metric('Quantidade de Vendas', formata_numero(dados_final.shape[0]))
-        with m3:
-            st.metric('Quantidade de Operadores', f'{qtd_operadores}')
-        with m4:
-            st.metric('Média Avaliação da compra', f"{media_avaliacao:.2f}" if not np.isnan(media_avaliacao) else 'Sem dados')
-
-        c1, c2 = st.columns(2)
-        with c1:
-            show_chart(fig_mapa_receita)
-            show_chart(fig_receita_estados)
-        with c2:
-            show_chart(fig_receita_mensal)
-            show_chart(fig_receitas_categorias)
-
-    # ---------------------------------------------------------------
-    # ABA 2 - QUANTIDADE DE VENDAS
-    # ---------------------------------------------------------------
+        mostrar_aba_graficos('receita')
+
+# ---------------------------------------------------------------
+# ABA 2 - QUANTIDADE DE VENDAS
+# ---------------------------------------------------------------
+if aba2.open:
     with aba2:
-        m1, m2, m3, m4 = st.columns(4)
-        with m1:
-            st.metric('Receita Total', formata_numero(dados_final['Preço'].sum(), 'R$'))
-        with m2:
-            st.metric('Quantidade de Vendas', formata_numero(dados_final.shape[0]))
-        with m3:
-            st.metric('Quantidade de Operadores', f'{qtd_operadores}')
-        with m4:
-            st.metric('Média Avaliação da compra', f"{media_avaliacao:.2f}" if not np.isnan(media_avaliacao) else 'Sem dados')
-
-        c1, c2 = st.columns(2)
-        with c1:
-            show_chart(fig_mapa_vendas)
-            show_chart(fig_vendas_estados)
-        with c2:
-            show_chart(fig_vendas_mensal)
-            show_chart(fig_vendas_categorias)
-
-    # ---------------------------------------------------------------
-    # ABA 3 - VENDEDORES
-    # ---------------------------------------------------------------
-    with aba3:
-        qtd_vendedores = st.number_input('Quantidade de vendedores', 2, 10, 5)
-        m1, m2, m3, m4 = st.columns(4)
-        with m1:
-            st.metric('Receita Total', formata_numero(dados_final['Preço'].sum(), 'R$'))
-        with m2:
-            st.metric('Quantidade de Vendas', formata_numero(dados_final.shape[0]))
-        with m3:
-            st.metric('Quantidade de Operadores', f'{qtd_operadores}')
-        with m4:
-            st.metric('Média Avaliação da compra', f"{media_avaliacao:.2f}" if not np.isnan(media_avaliacao) else 'Sem dados')
-
-        c1, c2 = st.columns(2)
-
-        # Receita por vendedor
-        with c1:
-            fig_receita_vendedores = px.bar(
-                vendedores[['sum']].sort_values('sum', ascending=False).head(qtd_vendedores),
-                x='sum',
-                y=vendedores[['sum']].sort_values('sum', ascending=False).head(qtd_vendedores).index,
-                text_auto=True,
-                title=f'Top{qtd_vendedores} vendedores receita',
-            )
-            show_chart(fig_receita_vendedores)
-
-        # Quantidade com média escrita ao final da mesma barra
-        with c2:
-            df_top = (
-                dados_final.groupby('Vendedor').agg(
-                    Quantidade=('Preço', 'count'),
-                    MediaAvaliacao=('Avaliação da compra', 'mean'),
-                )
-                .reset_index()
-                .sort_values('Quantidade', ascending=False)
-                .head(qtd_vendedores)
-            )
+        mostrar_aba_graficos('quantidade')
 
-            media_vals = df_top['MediaAvaliacao'].round(2)
-            text_vals = media_vals.where(~media_vals.isna(), other='Sem dados').astype(str)
+# ---------------------------------------------------------------
+# ABA 3 - VENDEDORES
+# ---------------------------------------------------------------
+if aba3.open:
+    with aba3:
+        mostrar_aba_vendedores()
 
-            fig_vendas_vendedores = px.bar(
-                df_top,
-                x='Quantidade',
-                y='Vendedor',
-                orientation='h',
-                title=f'Top{qtd_vendedores} vendedores quantidade com média ao final da barra',
-                hover_data={'MediaAvaliacao': ':.2f'},
-            )
-            fig_vendas_vendedores.update_traces(
-                text=text_vals,
-                texttemplate='Média: %{text}',
-                textposition='outside',
-            )
-            fig_vendas_vendedores.update_layout(
-                xaxis_title='Quantidade de vendas',
-                yaxis_title='Vendedor',
+# ---------------------------------------------------------------
+# ABA 4 - DATA FRAME
+# ---------------------------------------------------------------
+if aba4.open:
+    with aba4:
+        with medir('dataframe'):
+            # lat/lon saíram dos dados; voltam pela tabela de estados, só na página
+            tabela_paginada(
+                dados_brutos, 'aba_dataframe', base_vendas.versao,
+                colunas=list(dados_brutos.columns) + COLUNAS_COORDENADAS, estados=base_vendas.estados,
             )
-            show_chart(fig_vendas_vendedores)
 
-    # ---------------------------------------------------------------
-    # ABA 4 - DATA FRAME
-    # ---------------------------------------------------------------
-    with aba4:
-        st.dataframe(dados_brutos, width='stretch')
+finalizar_com_painel()
@@ -0,0 +1,67 @@
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.sintetico import gerar_conteudo
+from vendas.ingestao import ler_dados_colunar, ler_dados_json
+
+# ====================================================================
+# BENCHMARK DE INGESTÃO  JSON original x leitura colunar com Arrow
+# ====================================================================
+# Cada caminho roda em um processo separado para que o pico de memória
+# (ru_maxrss) de um não contamine o outro. Saída: uma linha JSON por caso.
+CASOS = {'json': ler_dados_json, 'colunar': ler_dados_colunar}
+
+
+def pico_rss_bytes():
+    # ru_maxrss vem em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def medir_caso(caso, arquivo):
+    conteudo = Path(arquivo).read_bytes()
+    rss_antes = pico_rss_bytes()
+    inicio = time.perf_counter()
+    df = CASOS[caso](conteudo)
+    segundos = time.perf_counter() - inicio
+    return {
+        'caso': caso,
+        'linhas': len(df),
+        'segundos': round(segundos, 4),
+        'pico_memoria_bytes': max(pico_rss_bytes() - rss_antes, 0),
+        'memoria_final_bytes': int(df.memory_usage(deep=True).sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara os caminhos de ingestão do JSON da API.')
+    parser.add_argument('--linhas', type=int, default=200_000)
+    parser.add_argument('--caso', choices=sorted(CASOS), help=argparse.SUPPRESS)
+    parser.add_argument('--arquivo', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.caso:
+        print(json.dumps(medir_caso(args.caso, args.arquivo)))
+        return
+
+    arquivo = Path(tempfile.gettempdir()) / f'bench_ingestao_{args.linhas}.json'
+    if not arquivo.exists():
+        arquivo.write_bytes(gerar_conteudo(args.linhas))
+
+    for caso in CASOS:
+        saida = subprocess.run(
+            [sys.executable, __file__, '--caso', caso, '--arquivo', str(arquivo)],
+            check=True, capture_output=True, text=True,
+        )
+        print(saida.stdout.strip())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from benchmarks.sintetico import gerar_conteudo
+from vendas.cache import CACHES
+from vendas.filtros import REGIOES
+from vendas.instrumentacao import REGISTRO
+from vendas.servidor_local import ServidorLabdados
+
+# ====================================================================
+# TESTE DE CARGA  várias sessões simuladas contra um servidor local
+# ====================================================================
+# Sobe o ServidorLabdados com dados sintéticos e conduz N sessões do
+# streamlit.testing (AppTest) pelo Dashboard e pela página Dados Brutos,
+# trocando filtros, abas e páginas. Todas as sessões rodam neste processo e
+# compartilham os caches, como num servidor Streamlit real. Relata
+# percentis de latência por etapa, crescimento de RSS por sessão e o número
+# de requisições que chegaram à API.
+DASHBOARD = str(RAIZ / 'Dashboard.py')
+DADOS_BRUTOS = str(RAIZ / 'pages' / 'Dados Brutos.py')
+ABAS = ['Receita', 'Quantidade de Vendas', 'Vendedores', 'Data Frame']
+
+
+def rss_atual():
+    # RSS corrente (não o pico); fora do Linux, cai para o pico do processo
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _widget(elementos, rotulo):
+    for elemento in elementos:
+        if elemento.label == rotulo:
+            return elemento
+    raise LookupError(f'widget não encontrado: {rotulo}')
+
+
+# ====================================================================
+# ROTEIRO DE UMA SESSÃO
+# ====================================================================
+def roteiro_dashboard(app, sorteio):
+    yield 'abrir', lambda: app.run()
+    yield 'regiao', lambda: _widget(app.sidebar.selectbox, 'Selecione a região').select(
+        sorteio.choice(REGIOES)).run()
+    anos = _widget(app.sidebar.multiselect, 'Selecione os anos')
+    escolhidos = sorteio.sample(anos.options, sorteio.randint(1, len(anos.options)))
+    yield 'anos', lambda: anos.set_value(escolhidos).run()
+    for aba in ABAS[1:] + ABAS[:1]:
+        def trocar(aba=aba):
+            app.session_state['aba_dashboard'] = aba
+            app.run()
+        yield f'aba_{aba}', trocar
+        if aba == 'Vendedores':
+            yield 'qtd_vendedores', lambda: app.number_input[0].set_value(sorteio.randint(2, 10)).run()
+
+
+def roteiro_dados_brutos(app, sorteio):
+    yield 'abrir', lambda: app.run()
+    produtos = _widget(app.sidebar.multiselect, 'Selecione os produtos')
+    yield 'produtos', lambda: produtos.set_value(sorteio.sample(produtos.options, 3)).run()
+    preco = _widget(app.sidebar.slider, 'Selecione o preço')
+    minimo, maximo = preco.min, preco.max
+    # arrastar o slider gera um rerun por passo
+    for passo in range(1, 4):
+        yield 'slider_preco', lambda passo=passo: preco.set_value(
+            (minimo, maximo - (maximo - minimo) * passo / 5)).run()
+    yield 'ordenar', lambda: app.selectbox(key='dados_brutos_ordem').select('Preço').run()
+    yield 'pagina', lambda: app.number_input(key='dados_brutos_pagina').set_value(2).run()
+    yield 'formato', lambda: app.selectbox(key='formato_arquivo').select('parquet').run()
+
+
+def passos_da_sessao(numero, semente, timeout, apps):
+    from streamlit.testing.v1 import AppTest
+
+    sorteio = random.Random(semente + numero)
+    for pagina, arquivo, roteiro in (
+        ('dashboard', DASHBOARD, roteiro_dashboard),
+        ('dados_brutos', DADOS_BRUTOS, roteiro_dados_brutos),
+    ):
+        app = AppTest.from_file(arquivo, default_timeout=timeout)
+        apps.append(app)
+        for etapa, acao in roteiro(app, sorteio):
+            yield pagina, etapa, app, acao
+
+
+def executar(sessoes, concorrencia, semente, timeout):
+    # O AppTest não é seguro entre threads, então as sessões abertas avançam
+    # intercaladas, um rerun de cada vez, todas no mesmo processo e caches.
+    # As sessões terminadas ficam abertas até o fim, como usuários conectados.
+    medicoes, erros, rss_por_sessao, abertas = [], 0, [], []
+    ativas, proxima = deque(), 0
+    while ativas or proxima < sessoes:
+        while len(ativas) < concorrencia and proxima < sessoes:
+            ativas.append(passos_da_sessao(proxima, semente, timeout, abertas))
+            proxima += 1
+        passos = ativas.popleft()
+        try:
+            pagina, etapa, app, acao = next(passos)
+            inicio = time.perf_counter()
+            acao()
+        except StopIteration:
+            rss_por_sessao.append(rss_atual())
+            continue
+        except Exception:
+            # uma sessão quebrada não derruba o teste; conta e descarta
+            erros += 1
+            traceback.print_exc(file=sys.stderr)
+            rss_por_sessao.append(rss_atual())
+            continue
+        medicoes.append((pagina, etapa, time.perf_counter() - inicio))
+        erros += len(app.exception)
+        ativas.append(passos)
+    return medicoes, erros, rss_por_sessao
+
+
+# ====================================================================
+# RELATÓRIO
+# ====================================================================
+def percentis(tempos):
+    ms = np.asarray(tempos) * 1000
+    return {
+        'rodadas': len(ms),
+        'p50_ms': round(float(np.percentile(ms, 50)), 2),
+        'p90_ms': round(float(np.percentile(ms, 90)), 2),
+        'p99_ms': round(float(np.percentile(ms, 99)), 2),
+        'max_ms': round(float(ms.max()), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga com sessões simuladas do Streamlit.')
+    parser.add_argument('--sessoes', type=int, default=10)
+    parser.add_argument('--concorrencia', type=int, default=1, help='sessões abertas ao mesmo tempo, com reruns intercalados')
+    parser.add_argument('--linhas', type=int, default=20_000, help='tamanho do conjunto servido pela API local')
+    parser.add_argument('--latencia', type=float, default=0.2, help='segundos de espera por requisição à API')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=120, help='tempo máximo de cada rerun')
+    parser.add_argument('--saida', help='arquivo JSONL onde os resultados são acrescentados')
+    args = parser.parse_args()
+
+    registros = json.loads(gerar_conteudo(args.linhas, args.semente))
+    servidor = ServidorLabdados(registros, latencia=args.latencia).iniciar()
+    del registros
+
+    # antes de importar o app: API local e snapshot temporário (partida a frio)
+    diretorio = tempfile.TemporaryDirectory(prefix='carga_dashboard_')
+    os.environ['LABDADOS_URL'] = servidor.url
+    os.environ['DASHBOARD_SNAPSHOT_DIR'] = diretorio.name
+
+    rss_inicial = rss_atual()
+    inicio = time.perf_counter()
+    try:
+        medicoes, erros, rss_por_sessao = executar(args.sessoes, args.concorrencia, args.semente, args.timeout)
+    finally:
+        servidor.parar()
+        diretorio.cleanup()
+    duracao = time.perf_counter() - inicio
+
+    contexto = {
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sessoes': args.sessoes,
+        'concorrencia': args.concorrencia,
+        'linhas': args.linhas,
+        'latencia_api_s': args.latencia,
+    }
+    linhas = []
+    etapas = sorted({(p, e) for p, e, _ in medicoes})
+    for pagina, etapa in etapas:
+        tempos = [s for p, e, s in medicoes if (p, e) == (pagina, etapa)]
+        linhas.append(dict(contexto, tipo='latencia', pagina=pagina, etapa=etapa, **percentis(tempos)))
+    for pagina in sorted({p for p, _, _ in medicoes}):
+        tempos = [s for p, _, s in medicoes if p == pagina]
+        linhas.append(dict(contexto, tipo='latencia', pagina=pagina, etapa='todas', **percentis(tempos)))
+
+    # a primeira sessão paga a carga da base; o crescimento conta a partir dela
+    crescimento = (rss_por_sessao[-1] - rss_por_sessao[0]) / max(len(rss_por_sessao) - 1, 1)
+    linhas.append(dict(
+        contexto,
+        tipo='resumo',
+        duracao_s=round(duracao, 2),
+        reruns=len(medicoes),
+        erros=erros,
+        requisicoes_api=servidor.requisicoes,
+        requisicoes_api_por_sessao=round(servidor.requisicoes / args.sessoes, 2),
+        rss_inicial_mb=round(rss_inicial / 2 ** 20, 1),
+        rss_apos_primeira_sessao_mb=round(rss_por_sessao[0] / 2 ** 20, 1),
+        rss_final_mb=round(rss_por_sessao[-1] / 2 ** 20, 1),
+        rss_crescimento_por_sessao_mb=round(crescimento / 2 ** 20, 2),
+        caches={
+            f"{dict(rotulos)['funcao']}:{dict(rotulos)['resultado']}": valor
+            for (nome, rotulos), valor in sorted(REGISTRO.contadores.items())
+            if nome == 'cache_consultas_total'
+        },
+        caches_limitados=[cache.estatisticas() for cache in CACHES.values()],
+    ))
+
+    saida = open(args.saida, 'a', encoding='utf-8') if args.saida else None
+    try:
+        for linha in linhas:
+            texto = json.dumps(linha, ensure_ascii=False)
+            print(texto, flush=True)
+            if saida:
+                saida.write(texto + '\n')
+    finally:
+        if saida:
+            saida.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.sintetico import VENDEDORES, gerar_conteudo, gerar_vendas
+from vendas import graficos
+from vendas.base import montar_base
+from vendas.cubo import TRABALHADORES, montar_cubo
+from vendas.exportacao import converter_csv
+from vendas.filtros import assinatura_filtros, filtrar_vendas
+from vendas.ingestao import ler_dados
+
+# ====================================================================
+# SUÍTE DE BENCHMARKS  carga, filtro, agregação e gráficos fora do Streamlit
+# ====================================================================
+# Cada etapa é medida isoladamente. A saída tem uma linha JSON por
+# (etapa, linhas), pronta para comparar execuções e achar regressões.
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000]
+
+
+def cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def etapas(linhas, max_linhas_ingestao):
+    # a carga a partir do JSON só roda até um limite: o corpo de 10M linhas
+    # teria vários GB; acima disso mede-se só a montagem da base
+    if linhas <= max_linhas_ingestao:
+        conteudo = gerar_conteudo(linhas)
+        yield 'ingestao', lambda: montar_base(ler_dados(conteudo))
+        del conteudo
+
+    vendas = gerar_vendas(linhas)
+    yield 'montar_base', lambda: montar_base(vendas.copy())
+    base = montar_base(vendas)
+    del vendas
+    yield 'cubo_serial', lambda: montar_cubo(base.dados, trabalhadores=1)
+    yield 'cubo_paralelo', lambda: montar_cubo(base.dados, max(TRABALHADORES, 2), linhas_paralelo=0)
+
+    regiao, anos, vendedores = 'Sudeste', ['2021', '2022'], VENDEDORES[:3]
+    assinatura = assinatura_filtros(regiao, anos, vendedores, base.versao)
+    yield 'filtro_linhas', lambda: filtrar_vendas(base.dados, regiao, anos, vendedores)
+    yield 'filtro_cubo', lambda: filtrar_vendas(base.cubo, regiao, anos, vendedores)
+    yield 'criar_tabelas_e_graficos', lambda: graficos.criar_tabelas_e_graficos(base, assinatura)
+
+    vendedores_tabela = graficos.criar_tabelas_e_graficos(base, assinatura_filtros(versao=base.versao))[1]
+    yield 'top_vendedores', lambda: graficos.graficos_vendedores(vendedores_tabela, 5)
+    yield 'convert_csv', lambda: converter_csv(base.dados)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks do dashboard de vendas com dados sintéticos.')
+    parser.add_argument('--linhas', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help='tamanhos a medir (ex.: 10000 100000 1000000 10000000)')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--etapas', nargs='+', help='mede só as etapas indicadas')
+    parser.add_argument('--max-linhas-ingestao', type=int, default=1_000_000)
+    parser.add_argument('--saida', help='arquivo JSONL onde os resultados são acrescentados')
+    args = parser.parse_args()
+
+    contexto = {
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'pyarrow': pa.__version__,
+        'maquina': platform.machine(),
+    }
+
+    saida = open(args.saida, 'a', encoding='utf-8') if args.saida else None
+    try:
+        for linhas in args.linhas:
+            for etapa, funcao in etapas(linhas, args.max_linhas_ingestao):
+                if args.etapas and etapa not in args.etapas:
+                    continue
+                tempos = cronometrar(funcao, args.repeticoes)
+                resultado = dict(
+                    contexto,
+                    etapa=etapa,
+                    linhas=linhas,
+                    repeticoes=args.repeticoes,
+                    min_s=round(min(tempos), 6),
+                    mediana_s=round(statistics.median(tempos), 6),
+                )
+                linha = json.dumps(resultado, ensure_ascii=False)
+                print(linha, flush=True)
+                if saida:
+                    saida.write(linha + '\n')
+    finally:
+        if saida:
+            saida.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# ====================================================================
+# GERADOR SINTÉTICO NO ESQUEMA DA API LABDADOS
+# ====================================================================
+ESTADOS = {
+    'AC': (-9.97, -67.81), 'AL': (-9.67, -35.74), 'AM': (-3.12, -60.02), 'AP': (0.03, -51.07),
+    'BA': (-12.97, -38.50), 'CE': (-3.72, -38.54), 'DF': (-15.78, -47.93), 'ES': (-20.32, -40.34),
+    'GO': (-16.68, -49.25), 'MA': (-2.53, -44.30), 'MG': (-19.92, -43.94), 'MS': (-20.44, -54.65),
+    'MT': (-15.60, -56.10), 'PA': (-1.46, -48.50), 'PB': (-7.12, -34.86), 'PE': (-8.05, -34.88),
+    'PI': (-5.09, -42.80), 'PR': (-25.43, -49.27), 'RJ': (-22.91, -43.21), 'RN': (-5.79, -35.21),
+    'RO': (-8.76, -63.90), 'RR': (2.82, -60.67), 'RS': (-30.03, -51.23), 'SC': (-27.60, -48.55),
+    'SE': (-10.91, -37.07), 'SP': (-23.55, -46.64), 'TO': (-10.25, -48.32),
+}
+# estados mais populosos aparecem mais, como nos dados reais
+PESOS_ESTADOS = {'SP': 30, 'RJ': 12, 'MG': 12, 'RS': 6, 'PR': 6, 'BA': 6, 'SC': 4, 'DF': 3}
+
+CATEGORIAS = {
+    'eletronicos': ['Smartwatch', 'Celular Plus X42', 'TV Led UHD 4K', 'Fone de ouvido', 'Tablet ABXY'],
+    'moveis': ['Cadeira de escritório', 'Mesa de jantar', 'Sofá retrátil', 'Cama king', 'Guarda roupas'],
+    'eletrodomesticos': ['Lavadora de roupas', 'Geladeira', 'Micro-ondas', 'Lava louças', 'Fogão'],
+    'brinquedos': ['Boneca bebê', 'Carrinho controle remoto', 'Quebra cabeça', 'Blocos de montar'],
+    'esporte e lazer': ['Bola de futebol', 'Bicicleta', 'Corda de pular', 'Kit halteres'],
+    'instrumentos musicais': ['Guitarra', 'Violão', 'Bateria', 'Teclado'],
+    'livros': ['Iniciando em programação', 'Dashboards com Power BI', 'Ciência de dados com python'],
+    'utilidades domesticas': ['Jogo de panelas', 'Copo térmico', 'Faqueiro', 'Panela de pressão'],
+}
+VENDEDORES = [
+    'Pedro Gomes', 'Beatriz Moraes', 'Nadia Oliveira', 'Mariana Ferreira', 'Thiago Silva',
+    'Rafael Costa', 'Maria Lopes', 'Lucas Oliveira', 'Bruno Rodrigues', 'Juliana Costa',
+]
+PAGAMENTOS = ['cartao_credito', 'boleto', 'cupom', 'cartao_debito']
+
+
+def gerar_vendas(linhas, semente=0, ano_inicial=2020, anos=4):
+    rng = np.random.default_rng(semente)
+
+    produtos = [(p, c) for c, lista in CATEGORIAS.items() for p in lista]
+    i_produto = rng.integers(len(produtos), size=linhas)
+
+    ufs = list(ESTADOS)
+    pesos = np.array([PESOS_ESTADOS.get(uf, 1) for uf in ufs], dtype='float64')
+    i_estado = rng.choice(len(ufs), size=linhas, p=pesos / pesos.sum())
+    coordenadas = np.array([ESTADOS[uf] for uf in ufs])
+
+    dias = rng.integers(0, 365 * anos, size=linhas)
+    datas = np.datetime64(f'{ano_inicial}-01-01') + dias.astype('timedelta64[D]')
+
+    # colunas de texto como object, igual ao que DataFrame.from_dict produz
+    def texto(valores, indices):
+        return np.asarray(valores, dtype=object)[indices]
+
+    return pd.DataFrame({
+        'Produto': texto([p for p, _ in produtos], i_produto),
+        'Categoria do Produto': texto([c for _, c in produtos], i_produto),
+        'Preço': np.round(rng.gamma(2.0, 400.0, size=linhas) + 10, 2),
+        'Frete': np.round(rng.uniform(0, 150, size=linhas), 2),
+        'Data da Compra': pd.to_datetime(datas),
+        'Vendedor': texto(VENDEDORES, rng.integers(len(VENDEDORES), size=linhas)),
+        'Local da compra': texto(ufs, i_estado),
+        'Avaliação da compra': rng.integers(1, 6, size=linhas),
+        'Tipo de pagamento': texto(PAGAMENTOS, rng.integers(len(PAGAMENTOS), size=linhas)),
+        'Quantidade de parcelas': rng.integers(1, 25, size=linhas),
+        'lat': coordenadas[i_estado, 0],
+        'lon': coordenadas[i_estado, 1],
+    })
+
+
+def gerar_conteudo(linhas, semente=0):
+    # corpo JSON como a API devolve: lista de registros com data dd/mm/aaaa
+    vendas = gerar_vendas(linhas, semente)
+    vendas['Data da Compra'] = vendas['Data da Compra'].dt.strftime('%d/%m/%Y')
+    return vendas.to_json(orient='records', force_ascii=False).encode('utf-8')
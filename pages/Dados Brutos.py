@@ -2,10 +2,23 @@ import streamlit as st
 import pandas as pd
 import time
 
+import requests
+
+from vendas.cache import em_cache, orcamento_ambiente
+from vendas.cliente import URL_LABDADOS
+from vendas.exportacao import FORMATOS, exportar_selecao
+from vendas.indices import filtrar_linhas, montar_indice
+from vendas.instrumentacao import iniciar_execucao, medir
+from vendas.normalizacao import COLUNAS_COORDENADAS
+from vendas.painel import finalizar_com_painel, interromper_com_painel
+from vendas.repositorio import obter_repositorio
+from vendas.tabela import tabela_paginada
+
 # ====================================================================
 # CONFIGURAÇÃO GERAL
 # ====================================================================
 st.set_page_config(page_title="Dados brutos", layout="wide")
+iniciar_execucao("dados_brutos")
 
 # ====================================================================
 # AJUSTE PARA TELA NO TOPO
@@ -25,9 +38,13 @@ st.markdown(
 )
 
 
-@st.cache_data
-def convert_csv(df):    
-    return df.to_csv(index = False).encode('utf-8')
+# Índices de filtro: montados uma vez por versão e compartilhados entre sessões.
+# Ficam no orçamento em bytes de vendas.cache; um índice pode ocupar o
+# orçamento inteiro, então o da versão atual sempre cabe. Um índice tem
+# cerca de 43 MB por milhão de linhas: o padrão comporta 10 milhões.
+@em_cache('indices', orcamento_ambiente('DASHBOARD_CACHE_INDICES_MB', 512), fracao_maxima=1)
+def indice_em_cache(_dados, versao):
+    return montar_indice(_dados)
 
 def mensagem_sucesso():
     sucesso = st.success('Arquivo baixado com suecsso', icon="✅")
@@ -42,12 +59,17 @@ st.title("DADOS BRUTOS")
 # ====================================================================
 # VERIFICAÇÃO E CARREGAMENTO DOS DADOS
 # ====================================================================
-if "dados_brutos" not in st.session_state or not isinstance(st.session_state["dados_brutos"], pd.DataFrame):
-    st.warning("Os dados ainda não foram carregados. Abra primeiro a página principal do Dashboard para inicializar os dados.")
-    st.stop()
-
-# Recupera os dados da sessão (cache compartilhado)
-dados = st.session_state["dados_brutos"].copy()
+# Usa a mesma base do processo que o Dashboard; carrega aqui se ainda não existir
+try:
+    with st.spinner("Carregando dados..."):
+        with medir("carregar_dados"):
+            base_vendas = obter_repositorio(URL_LABDADOS).obter()
+except requests.exceptions.RequestException as e:
+    st.error(f"Erro de Conexão {e}")
+    interromper_com_painel()
+
+# Sem cópia: a página só lê a base compartilhada
+dados = base_vendas.dados
 
 # ====================================================================
 # FILTROS E VISUALIZAÇÃO
@@ -55,19 +77,24 @@ dados = st.session_state["dados_brutos"].copy()
 
 # Selecionar colunas
 with st.expander("Colunas"):
+    todas_colunas = list(dados.columns) + COLUNAS_COORDENADAS
     colunas = st.multiselect(
         "Selecione as colunas",
-        list(dados.columns),
-        default=list(dados.columns)
+        todas_colunas,
+        default=todas_colunas
     )
 
 # Filtros laterais
 st.sidebar.title("Filtros")
 
+# O índice já tem as opções e os limites dos filtros: nada aqui varre as linhas
+with medir("indice"):
+    indice = indice_em_cache(dados, base_vendas.versao)
+
 # Produto
 with st.sidebar.expander("Nome do produto"):
     if "Produto" in dados.columns:
-        lista_produtos = sorted(dados["Produto"].dropna().unique().tolist())
+        lista_produtos = indice.produtos()
         produtos = st.multiselect(
             "Selecione os produtos",
             lista_produtos,
@@ -78,9 +105,9 @@ with st.sidebar.expander("Nome do produto"):
 
 # Preço
 with st.sidebar.expander("Preço"):
-    if "Preço" in dados.columns and not dados["Preço"].dropna().empty:
-        preco_min = float(dados["Preço"].min())
-        preco_max = float(dados["Preço"].max())
+    limites_preco = indice.preco.limites() if "Preço" in dados.columns else None
+    if limites_preco is not None:
+        preco_min, preco_max = (float(v) for v in limites_preco)
         if preco_min == preco_max:
             preco = (preco_min, preco_max)
             st.caption("Intervalo fixo pois todos os preços são iguais.")
@@ -96,12 +123,9 @@ with st.sidebar.expander("Preço"):
 
 # Data da compra
 with st.sidebar.expander("Data da Compra"):
-    if "Data da Compra" in dados.columns and not dados["Data da Compra"].dropna().empty:
-        # garante dtype datetime
-        if not pd.api.types.is_datetime64_any_dtype(dados["Data da Compra"]):
-            dados["Data da Compra"] = pd.to_datetime(dados["Data da Compra"], errors="coerce")
-        data_min = dados["Data da Compra"].min().date()
-        data_max = dados["Data da Compra"].max().date()
+    limites_data = indice.data.limites() if "Data da Compra" in dados.columns else None
+    if limites_data is not None:
+        data_min, data_max = (pd.Timestamp(v).date() for v in limites_data)
         data_compra = st.date_input("Selecione a data", (data_min, data_max))
     else:
         data_compra = None
@@ -109,38 +133,38 @@ with st.sidebar.expander("Data da Compra"):
 # ====================================================================
 # APLICAÇÃO DOS FILTROS
 # ====================================================================
-mask = pd.Series(True, index=dados.index)
-
-if produtos:
-    if "Produto" in dados.columns:
-        mask &= dados["Produto"].isin(produtos)
-
-if preco is not None and "Preço" in dados.columns:
-    mask &= dados["Preço"].between(preco[0], preco[1])
-
-if data_compra and isinstance(data_compra, (list, tuple)) and len(data_compra) == 2:
-    if "Data da Compra" in dados.columns:
-        data_ini = pd.to_datetime(data_compra[0])
-        data_fim = pd.to_datetime(data_compra[1])
-        mask &= dados["Data da Compra"].between(data_ini, data_fim)
-
-# Aplica a máscara e colunas selecionadas
-if colunas:
-    dados_filtrados = dados.loc[mask, colunas]
-else:
-    dados_filtrados = dados.loc[mask]
+with medir("filtros"):
+    filtro_produtos = produtos if "Produto" in dados.columns else None
+    filtro_preco = preco if "Preço" in dados.columns else None
+    filtro_datas = None
+    if data_compra and isinstance(data_compra, (list, tuple)) and len(data_compra) == 2:
+        if "Data da Compra" in dados.columns:
+            filtro_datas = (pd.to_datetime(data_compra[0]), pd.to_datetime(data_compra[1]))
+
+    # None quando nenhum filtro restringe: todas as linhas, sem varrer nada
+    linhas = filtrar_linhas(indice, filtro_produtos, filtro_preco, filtro_datas)
+
+    # Só as posições e as colunas: nenhuma cópia dos dados filtrados
+    if not colunas:
+        colunas = todas_colunas
+    quantidade = len(dados) if linhas is None else len(linhas)
 
 # ====================================================================
 # EXIBIÇÃO DOS DADOS
 # ====================================================================
-st.dataframe(dados_filtrados, width='stretch')
+with medir("dataframe"):
+    tabela_paginada(dados, "dados_brutos", base_vendas.versao, linhas, colunas, base_vendas.estados)
 st.markdown(
-    f"A tabela possui **:blue[{dados_filtrados.shape[0]}] linhas** e **:blue[{dados_filtrados.shape[1]}] colunas**."
+    f"A tabela possui **:blue[{quantidade}] linhas** e **:blue[{len(colunas)}] colunas**."
+)
+st.caption(
+    f"Memória da base: {base_vendas.memoria['depois'] / 1e6:.1f} MB "
+    f"(antes da normalização: {base_vendas.memoria['antes'] / 1e6:.1f} MB)"
 )
 
 st.markdown('Escreva um nome para o arquivo')
 
-coluna1, coluna2 = st.columns(2)
+coluna1, coluna2, coluna3 = st.columns(3)
 
 with coluna1:
     # entrada com rótulo válido e oculto
@@ -151,20 +175,42 @@ with coluna1:
         key='nome_arquivo'
     ).strip()
 
-    # se vier vazio, define um padrão
-    if not nome_arquivo:
-        nome_arquivo = 'dados'
+with coluna2:
+    formato = st.selectbox(
+        'Formato',
+        list(FORMATOS),
+        format_func=lambda f: FORMATOS[f][0],
+        label_visibility='collapsed',
+        key='formato_arquivo'
+    )
+    _, extensao, mime = FORMATOS[formato]
 
-    # garante extensão .csv sem duplicar
-    if not nome_arquivo.lower().endswith('.csv'):
-        nome_arquivo += '.csv'
+# se vier vazio, define um padrão
+if not nome_arquivo:
+    nome_arquivo = 'dados'
 
-with coluna2:
+# garante a extensão do formato sem duplicar
+for _, outra, _ in FORMATOS.values():
+    if nome_arquivo.lower().endswith(outra):
+        nome_arquivo = nome_arquivo[:-len(outra)]
+nome_arquivo += extensao
+
+# O arquivo só é gerado no clique, numa thread à parte; até lá a página
+# guarda apenas as posições das linhas selecionadas
+versao = base_vendas.versao
+estados = base_vendas.estados
+
+def gerar_arquivo():
+    return exportar_selecao(dados, versao, linhas, colunas, formato, estados)
+
+with coluna3:
     # botão de download
     st.download_button(
-        'Fazer download da tabela em csv',
-        data=convert_csv(dados_filtrados),
+        f'Fazer download da tabela em {FORMATOS[formato][0]}',
+        data=gerar_arquivo,
         file_name=nome_arquivo,
-        mime='text/csv',
+        mime=mime,
         on_click=mensagem_sucesso
     )
+
+finalizar_com_painel()
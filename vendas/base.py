@@ -0,0 +1,58 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from vendas.cubo import CHAVE_MES, MES_NULO, com_chave_mes, dimensao_estados, montar_cubo
+from vendas.normalizacao import normalizar_dados
+
+
+# ====================================================================
+# BASE DE VENDAS  dados brutos + estruturas derivadas na carga
+# ====================================================================
+class BaseVendas(NamedTuple):
+    dados: pd.DataFrame
+    cubo: pd.DataFrame
+    estados: pd.DataFrame
+    versao: str
+    memoria: dict
+    anos: list        # opções dos filtros, tiradas do cubo uma vez por versão
+    vendedores: list
+
+
+def versao_dados(dados):
+    # soma dos hashes das linhas do frame normalizado: muda com qualquer valor
+    # (não só com as medidas do cubo) e não depende da ordem das linhas, que
+    # varia com a divisão em partições. Os caches por versão dependem disso.
+    linhas = int(pd.util.hash_pandas_object(dados, index=False).sum())
+    colunas = int(pd.util.hash_array(np.asarray(dados.columns, dtype=object)).sum())
+    return format((linhas + colunas) & 0xFFFFFFFFFFFFFFFF, '016x')
+
+
+def anos_do_cubo(cubo):
+    meses = cubo[CHAVE_MES].to_numpy()
+    anos = np.unique(meses[meses != MES_NULO].astype('int64') // 12) + 1970
+    return [str(a) for a in anos]
+
+
+def montar_base(dados):
+    dados, estados, memoria = normalizar_dados(dados)
+    return montar_base_compacta(dados, estados, memoria)
+
+
+def montar_base_compacta(dados, estados, memoria, cubo=None):
+    # usado quando os dados já chegam normalizados (ex.: snapshot em disco)
+    if cubo is None:
+        cubo = montar_cubo(dados)
+    # snapshots antigos não têm a chave do mês, e os estados seguiam outra ordem
+    cubo = com_chave_mes(cubo)
+    estados = dimensao_estados(dados['Local da compra'].cat.categories, estados)
+    return BaseVendas(
+        dados=dados,
+        cubo=cubo,
+        estados=estados,
+        versao=versao_dados(dados),
+        memoria=memoria,
+        anos=anos_do_cubo(cubo),
+        vendedores=sorted(cubo['Vendedor'].dropna().unique().tolist()),
+    )
@@ -0,0 +1,171 @@
+import functools
+import inspect
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from vendas.instrumentacao import REGISTRO, registrar_miss
+
+# ====================================================================
+# CACHE COM ORÇAMENTO EM BYTES  no lugar do st.cache_data sem limite
+# ====================================================================
+# Cada entrada guarda o tamanho estimado do valor; quando o total passa do
+# orçamento, saem as menos usadas recentemente. Um valor maior que um quarto
+# do orçamento nem entra, para uma consulta grande não esvaziar o cache
+# inteiro; a recusa vai para o log, porque esse valor é recalculado a cada
+# chamada. Os valores voltam sem cópia (ninguém os altera). Os caches ficam
+# neste módulo, por nome, porque o script da página roda de novo a cada rerun.
+FRACAO_MAXIMA_ENTRADA = 4
+
+CACHES = {}
+_AUSENTE = object()
+_lock_caches = threading.Lock()
+
+logger = logging.getLogger('dashboard_vendas.cache')
+
+
+def orcamento_ambiente(variavel, padrao_mb):
+    return int(float(os.environ.get(variavel, padrao_mb)) * 2 ** 20)
+
+
+def tamanho_estimado(valor, _vistos=None):
+    # estimativa conservadora: arrays contam inteiros, mesmo quando são
+    # visões de colunas que a base já guarda
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, (str, bytes, bytearray, int, float, bool)) or valor is None:
+        return sys.getsizeof(valor)
+
+    # contêineres: soma o conteúdo, contando cada objeto uma vez só
+    _vistos = set() if _vistos is None else _vistos
+    if id(valor) in _vistos:
+        return 0
+    _vistos.add(id(valor))
+    if hasattr(valor, 'to_plotly_json'):
+        # figura do plotly: dados e layout como dicionários e arrays
+        return tamanho_estimado(valor.to_plotly_json(), _vistos)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(
+            tamanho_estimado(k, _vistos) + tamanho_estimado(v, _vistos) for k, v in valor.items()
+        )
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return sys.getsizeof(valor) + sum(tamanho_estimado(v, _vistos) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class CacheLimitado:
+    def __init__(self, nome, orcamento, fracao_maxima=FRACAO_MAXIMA_ENTRADA):
+        self.nome = nome
+        self.orcamento = orcamento
+        self.maximo_entrada = orcamento // fracao_maxima
+        self._entradas = OrderedDict()  # chave -> (valor, tamanho)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = self.misses = self.remocoes = self.recusas = 0
+        REGISTRO.definir('cache_orcamento_bytes', orcamento, cache=nome)
+
+    def consultar(self, chave, padrao=None):
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                self._entradas.move_to_end(chave)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entrada is None:
+            registrar_miss()
+            REGISTRO.incrementar('cache_eventos_total', cache=self.nome, evento='miss')
+            return padrao
+        REGISTRO.incrementar('cache_eventos_total', cache=self.nome, evento='hit')
+        return entrada[0]
+
+    def obter(self, chave, calcular):
+        valor = self.consultar(chave, _AUSENTE)
+        if valor is _AUSENTE:
+            # calcula fora do lock: duas sessões com a mesma chave podem
+            # calcular em dobro, mas uma não espera pela consulta da outra
+            valor = calcular()
+            self.guardar(chave, valor)
+        return valor
+
+    def guardar(self, chave, valor):
+        tamanho = tamanho_estimado(valor)
+        removidas = 0
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self.bytes -= anterior[1]
+            if tamanho > self.maximo_entrada:
+                self.recusas += 1
+            else:
+                self._entradas[chave] = (valor, tamanho)
+                self.bytes += tamanho
+                while self.bytes > self.orcamento:
+                    _, (_, liberado) = self._entradas.popitem(last=False)
+                    self.bytes -= liberado
+                    removidas += 1
+                self.remocoes += removidas
+            ocupado, entradas = self.bytes, len(self._entradas)
+
+        if tamanho > self.maximo_entrada:
+            REGISTRO.incrementar('cache_eventos_total', cache=self.nome, evento='recusa')
+            logger.warning(
+                'Cache %s recusou uma entrada de %.1f MB (máximo %.1f MB); ela será recalculada a cada uso',
+                self.nome, tamanho / 2 ** 20, self.maximo_entrada / 2 ** 20,
+            )
+        if removidas:
+            REGISTRO.incrementar('cache_eventos_total', removidas, cache=self.nome, evento='remocao')
+        REGISTRO.definir('cache_ocupado_bytes', ocupado, cache=self.nome)
+        REGISTRO.definir('cache_entradas', entradas, cache=self.nome)
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                'cache': self.nome,
+                'entradas': len(self._entradas),
+                'bytes': self.bytes,
+                'orcamento': self.orcamento,
+                'hits': self.hits,
+                'misses': self.misses,
+                'remocoes': self.remocoes,
+                'recusas': self.recusas,
+                'taxa_acerto': round(self.hits / consultas, 3) if consultas else None,
+            }
+
+
+def cache_limitado(nome, orcamento, fracao_maxima=FRACAO_MAXIMA_ENTRADA):
+    # o mesmo objeto em todos os reruns e sessões; o orçamento vale na criação
+    with _lock_caches:
+        if nome not in CACHES:
+            CACHES[nome] = CacheLimitado(nome, orcamento, fracao_maxima)
+        return CACHES[nome]
+
+
+def em_cache(nome, orcamento, fracao_maxima=FRACAO_MAXIMA_ENTRADA):
+    # decorador no molde do st.cache_data: argumentos com '_' no nome
+    # ficam fora da chave
+    def decorador(funcao):
+        assinatura = inspect.signature(funcao)
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            argumentos = assinatura.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            chave = (funcao.__qualname__,) + tuple(
+                (n, v) for n, v in argumentos.arguments.items() if not n.startswith('_')
+            )
+            return cache_limitado(nome, orcamento, fracao_maxima).obter(chave, lambda: funcao(*args, **kwargs))
+
+        return envolvida
+
+    return decorador
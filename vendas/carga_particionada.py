@@ -0,0 +1,111 @@
+import hashlib
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+
+import pandas as pd
+import requests
+
+from vendas.filtros import ESTADO_REGIAO
+from vendas.ingestao import RespostaInvalida, ler_dados
+
+# ====================================================================
+# CARGA PARTICIONADA  região x ano, baixados em paralelo
+# ====================================================================
+# Ative com LABDADOS_PARTICIONADO=1. Cada partição é uma chamada à API com
+# 'regiao' e 'ano' e é lida assim que chega, na própria thread que a
+# baixou. Uma partição que falha volta para a fila sozinha; as que já
+# chegaram não são baixadas de novo.
+#
+# A API só filtra por região e ano, então nenhuma partição alcança uma UF
+# fora de ESTADO_REGIAO, uma data nula ou um ano anterior ao histórico
+# conhecido. Por isso a primeira carga, a base que tem vendas assim e uma a
+# cada LABDADOS_VARREDURA atualizações fazem a varredura inteira (a busca
+# sem filtro), que também traz anos retroativos.
+CARGA_PARTICIONADA = os.environ.get('LABDADOS_PARTICIONADO', '') == '1'
+PARALELO = int(os.environ.get('LABDADOS_PARALELO', 8))
+VARREDURA_A_CADA = int(os.environ.get('LABDADOS_VARREDURA', 6))
+REPETICOES_PARTICAO = 2
+
+logger = logging.getLogger('dashboard_vendas.carga_particionada')
+
+
+def anos_da_base(base):
+    # do primeiro ano já visto até o ano corrente
+    primeiro = int(base.anos[0])
+    return list(range(primeiro, date.today().year + 1))
+
+
+def particoes(anos):
+    regioes = sorted({nome.lower() for nome in ESTADO_REGIAO.values()})
+    return [{'regiao': regiao, 'ano': str(ano)} for regiao in regioes for ano in anos]
+
+
+def particoes_da_base(base):
+    # None pede a varredura inteira: sem base, ou quando a base tem vendas
+    # que nenhum par região x ano alcança
+    if base is None or not base.anos:
+        return None
+    dados = base.dados
+    fora_do_mapa = ~dados['Local da compra'].isin(list(ESTADO_REGIAO))
+    if fora_do_mapa.any() or dados['Data da Compra'].isna().any():
+        return None
+    return particoes(anos_da_base(base))
+
+
+def _baixar(cliente, params):
+    conteudo = cliente.buscar(params=params).conteudo
+    hash_parte = hashlib.sha256(conteudo).digest()
+    # partição vazia ('[]') não tem colunas para o leitor de JSON
+    if not conteudo.strip(b' \t\r\n[]'):
+        return hash_parte, None
+    return hash_parte, ler_dados(conteudo)
+
+
+def _concatenar(partes):
+    # categorias diferentes entre partes virariam object no concat; uma parte
+    # que caiu no leitor original traz texto como object e vira categoria aqui
+    categoricas = {
+        coluna for parte in partes
+        for coluna, tipo in parte.dtypes.items() if isinstance(tipo, pd.CategoricalDtype)
+    }
+    for coluna in sorted(categoricas):
+        for parte in partes:
+            if not isinstance(parte[coluna].dtype, pd.CategoricalDtype):
+                parte[coluna] = parte[coluna].astype('category')
+        categorias = pd.api.types.union_categoricals([p[coluna] for p in partes]).categories
+        for parte in partes:
+            parte[coluna] = parte[coluna].cat.set_categories(categorias)
+    return pd.concat(partes, ignore_index=True)
+
+
+def buscar_particionado(cliente, lista_particoes, paralelo=PARALELO, repeticoes=REPETICOES_PARTICAO):
+    resultados = [None] * len(lista_particoes)
+    falhas = [0] * len(lista_particoes)
+
+    with ThreadPoolExecutor(max_workers=paralelo, thread_name_prefix='particao') as executor:
+        pendentes = {
+            executor.submit(_baixar, cliente, params): i for i, params in enumerate(lista_particoes)
+        }
+        while pendentes:
+            prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                i = pendentes.pop(futuro)
+                try:
+                    resultados[i] = futuro.result()
+                except requests.RequestException as e:
+                    falhas[i] += 1
+                    if falhas[i] > repeticoes:
+                        for restante in pendentes:
+                            restante.cancel()
+                        raise
+                    logger.warning('Partição %s falhou (%s), tentando de novo', lista_particoes[i], e)
+                    pendentes[executor.submit(_baixar, cliente, lista_particoes[i])] = i
+
+    # o hash combina as partições na ordem fixa, não na de chegada
+    hash_conteudo = hashlib.sha256(b''.join(h for h, _ in resultados)).hexdigest()
+    partes = [dados for _, dados in resultados if dados is not None]
+    if not partes:
+        raise RespostaInvalida('a API não retornou vendas em nenhuma partição')
+    return hash_conteudo, _concatenar(partes)
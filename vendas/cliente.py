@@ -0,0 +1,79 @@
+import os
+import random
+import threading
+import time
+from typing import NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ====================================================================
+# CLIENTE HTTP DA API LABDADOS
+# ====================================================================
+# LABDADOS_URL permite apontar para o servidor local (vendas.servidor_local)
+URL_LABDADOS = os.environ.get('LABDADOS_URL', 'https://labdados.com/produtos')
+
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504}
+
+
+class RespostaLabdados(NamedTuple):
+    status: int
+    conteudo: Optional[bytes]
+    etag: Optional[str]
+    ultima_modificacao: Optional[str]
+
+    @property
+    def nao_modificado(self):
+        return self.status == 304
+
+
+class ClienteLabdados:
+    # timeout = (conexão, leitura); nenhuma chamada fica presa indefinidamente
+    def __init__(self, url=URL_LABDADOS, timeout=(5, 15), tentativas=3,
+                 espera_base=0.5, max_conexoes=8):
+        self.url = url
+        self.timeout = timeout
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+
+        # uma Session com pool reaproveita conexões TCP/TLS entre chamadas
+        self.session = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max_conexoes)
+        self.session.mount('http://', adaptador)
+        self.session.mount('https://', adaptador)
+        self._semaforo = threading.BoundedSemaphore(max_conexoes)
+
+    def _espera(self, tentativa):
+        # backoff exponencial com jitter completo
+        return random.uniform(0, self.espera_base * 2 ** tentativa)
+
+    def buscar(self, params=None, etag=None, ultima_modificacao=None):
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if ultima_modificacao:
+            headers['If-Modified-Since'] = ultima_modificacao
+
+        for tentativa in range(self.tentativas):
+            ultima = tentativa == self.tentativas - 1
+            try:
+                with self._semaforo:
+                    response = self.session.get(self.url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if ultima:
+                    raise
+            else:
+                if response.status_code == 304:
+                    return RespostaLabdados(304, None, etag, ultima_modificacao)
+                if response.status_code not in STATUS_RETENTAVEIS or ultima:
+                    response.raise_for_status()
+                    return RespostaLabdados(
+                        response.status_code,
+                        response.content,
+                        response.headers.get('ETag'),
+                        response.headers.get('Last-Modified'),
+                    )
+            time.sleep(self._espera(tentativa))
+
+    def fechar(self):
+        self.session.close()
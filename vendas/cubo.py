@@ -0,0 +1,192 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from vendas.filtros import ESTADO_REGIAO
+
+# ====================================================================
+# CUBO DE VENDAS  mês x estado x categoria x vendedor
+# ====================================================================
+# A coluna 'Data da Compra' do cubo guarda o último dia do mês, igual ao
+# rótulo gerado por pd.Grouper(freq='ME'), assim os filtros de ano funcionam
+# tanto no cubo quanto nas linhas brutas.
+CHAVES_CUBO = ['Data da Compra', 'Local da compra', 'Categoria do Produto', 'Vendedor']
+# chave inteira do mês (meses desde jan/1970), calculada uma vez na carga;
+# o calendário (dimensão de datas) sai do intervalo das chaves
+CHAVE_MES = 'Chave Mês'
+# vendas sem data entram nos totais, mas não em nenhum mês
+MES_NULO = np.iinfo(np.int16).min
+
+
+def com_chave_mes(cubo):
+    if CHAVE_MES in cubo.columns:
+        return cubo
+    datas = cubo['Data da Compra'].to_numpy()
+    meses = np.where(np.isnat(datas), MES_NULO, datas.astype('datetime64[M]').astype('int64'))
+    return cubo.assign(**{CHAVE_MES: meses.astype('int16')})
+
+
+# Acima de LINHAS_PARALELO a base é dividida por estado e cada parte é
+# agregada numa thread (os kernels de groupby do pandas liberam o GIL).
+# Como um estado cai sempre na mesma parte, as chaves das partes não se
+# repetem e juntá-las é exato, sem reagregar.
+LINHAS_PARALELO = int(os.environ.get('DASHBOARD_CUBO_LINHAS_PARALELO', 2_000_000))
+TRABALHADORES = int(os.environ.get('DASHBOARD_CUBO_TRABALHADORES', 0)) or os.cpu_count() or 1
+
+
+def _agregar(dados):
+    mes = dados['Data da Compra'].dt.to_period('M').dt.to_timestamp(how='end').dt.normalize()
+    chaves = [mes] + [dados[c] for c in CHAVES_CUBO[1:]]
+    # dropna=False: linha com chave nula continua contando nos totais
+    return (
+        dados.groupby(chaves, observed=True, sort=False, dropna=False)
+        .agg(**{
+            'Preço': ('Preço', 'sum'),
+            'Contagem': ('Preço', 'size'),
+            'Avaliação da compra': ('Avaliação da compra', 'sum'),
+        })
+        .reset_index()
+    )
+
+
+def particoes_por_estado(dados, partes):
+    # posições das linhas de cada parte, pelo código do estado
+    local = dados['Local da compra']
+    if isinstance(local.dtype, pd.CategoricalDtype):
+        codigos = local.cat.codes.to_numpy()
+    else:
+        codigos = pd.factorize(local)[0]
+    parte = codigos % partes
+    ordem = np.argsort(parte, kind='stable')
+    limites = np.cumsum(np.bincount(parte, minlength=partes))[:-1]
+    return [p for p in np.split(ordem, limites) if len(p)]
+
+
+def montar_cubo(dados, trabalhadores=None, linhas_paralelo=None):
+    trabalhadores = trabalhadores or TRABALHADORES
+    linhas_paralelo = LINHAS_PARALELO if linhas_paralelo is None else linhas_paralelo
+    if trabalhadores < 2 or len(dados) < linhas_paralelo:
+        return com_chave_mes(_agregar(dados))
+
+    particoes = particoes_por_estado(dados, trabalhadores)
+    with ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix='cubo') as executor:
+        parciais = list(executor.map(lambda posicoes: _agregar(dados.take(posicoes)), particoes))
+    return com_chave_mes(pd.concat(parciais, ignore_index=True))
+
+
+def coordenadas_estados(dados):
+    return (
+        dados.drop_duplicates(subset='Local da compra')[['Local da compra', 'lat', 'lon']]
+        .reset_index(drop=True)
+    )
+
+
+# ====================================================================
+# DIMENSÕES  as colunas categóricas são as chaves inteiras do modelo
+# ====================================================================
+# Os códigos de uma coluna categórica (int8/int16) são as chaves; as
+# categorias são a dimensão. Estado tem também lat/lon e região, numa
+# tabela na mesma ordem dos códigos: a linha i é o estado de código i.
+def dimensao_estados(categorias, coordenadas):
+    dimensao = (
+        coordenadas.drop_duplicates(subset='Local da compra')
+        .set_index('Local da compra')[['lat', 'lon']]
+        .reindex(pd.Index(categorias, name='Local da compra'))
+        .reset_index()
+    )
+    dimensao['Regiao'] = dimensao['Local da compra'].map(ESTADO_REGIAO)
+    return dimensao
+
+
+def _somar_por_codigo(cubo, chave, medidas):
+    # bincount nos códigos; devolve os códigos presentes e a soma de cada medida
+    codigos = cubo[chave].cat.codes.to_numpy()
+    validos = codigos >= 0
+    codigos = codigos[validos]
+    tamanho = len(cubo[chave].cat.categories)
+    presentes = np.bincount(codigos, minlength=tamanho) > 0
+    totais = {}
+    for medida in medidas:
+        valores = cubo[medida].to_numpy()[validos]
+        soma = np.bincount(codigos, weights=valores, minlength=tamanho)
+        if np.issubdtype(valores.dtype, np.integer):
+            soma = soma.round().astype('int64')
+        totais[medida] = soma[presentes]
+    return np.flatnonzero(presentes), totais
+
+
+# ====================================================================
+# TABELAS DERIVADAS  reagregação do cubo já filtrado
+# ====================================================================
+def por_estado(cubo, estados, medida):
+    codigos, totais = _somar_por_codigo(cubo, 'Local da compra', [medida])
+    # junta com a dimensão só no fim, por posição
+    return (
+        estados.iloc[codigos][['Local da compra', 'lat', 'lon']]
+        .assign(**totais)
+        .sort_values(medida, ascending=False, kind='stable')
+    )
+
+
+def por_mes(cubo, medida):
+    datas = cubo['Data da Compra']
+    mes = cubo[CHAVE_MES].to_numpy()
+    validos = mes != MES_NULO
+    if not validos.any():
+        return pd.DataFrame({'Data da Compra': pd.DatetimeIndex([]), medida: [], 'Ano': [], 'Mes': []})
+    mes = mes[validos].astype('int64')
+    inicio = mes.min()
+    valores = cubo[medida].to_numpy()[validos]
+    total = np.bincount(mes - inicio, weights=valores)
+    if np.issubdtype(valores.dtype, np.integer):
+        total = total.round().astype('int64')
+    # mantém os meses sem vendas, como fazia o pd.Grouper(freq='ME')
+    meses = pd.date_range(datas.min(), datas.max(), freq='ME', name='Data da Compra')
+    mensal = pd.DataFrame({'Data da Compra': meses, medida: total})
+    mensal['Ano'] = mensal['Data da Compra'].dt.year
+    mensal['Mes'] = mensal['Data da Compra'].dt.month_name()
+    return mensal
+
+
+def por_categoria(cubo, medida):
+    codigos, totais = _somar_por_codigo(cubo, 'Categoria do Produto', [medida])
+    categorias = pd.CategoricalIndex(
+        pd.Categorical.from_codes(codigos, dtype=cubo['Categoria do Produto'].dtype),
+        name='Categoria do Produto',
+    )
+    return pd.DataFrame(totais, index=categorias).sort_values(medida, ascending=False, kind='stable')
+
+
+# Ranking calculado uma vez por estado dos filtros: o Top-N de cada gráfico
+# é só um recorte das primeiras N linhas, sem reordenar a cada N.
+class RankingVendedores(NamedTuple):
+    por_receita: pd.DataFrame
+    por_quantidade: pd.DataFrame
+
+
+def ranking_vendedores(cubo):
+    codigos, totais = _somar_por_codigo(cubo, 'Vendedor', ['Preço', 'Contagem', 'Avaliação da compra'])
+    vendedores = pd.DataFrame({
+        'Vendedor': cubo['Vendedor'].cat.categories[codigos].astype(str),
+        'Receita': totais['Preço'],
+        'Quantidade': totais['Contagem'],
+        'Avaliacao': totais['Avaliação da compra'],
+    })
+    vendedores['MediaAvaliacao'] = vendedores['Avaliacao'] / vendedores['Quantidade']
+    return RankingVendedores(
+        por_receita=vendedores.sort_values('Receita', ascending=False, kind='stable', ignore_index=True),
+        por_quantidade=vendedores.sort_values('Quantidade', ascending=False, kind='stable', ignore_index=True),
+    )
+
+
+def metricas_gerais(cubo):
+    vendas = int(cubo['Contagem'].sum())
+    return {
+        'receita': float(cubo['Preço'].sum()),
+        'vendas': vendas,
+        'operadores': int(cubo['Vendedor'].nunique()),
+        'media_avaliacao': float(cubo['Avaliação da compra'].sum() / vendas) if vendas else float('nan'),
+    }
@@ -0,0 +1,110 @@
+import gzip
+import hashlib
+import io
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+
+from vendas.cache import cache_limitado, orcamento_ambiente
+from vendas.instrumentacao import REGISTRO, medir, registrar_tamanho
+from vendas.normalizacao import COLUNAS_COORDENADAS, anexar_coordenadas
+
+# ====================================================================
+# EXPORTAÇÃO DOS DADOS FILTRADOS
+# ====================================================================
+# O arquivo é escrito em blocos de linhas direto no destino (já compactado,
+# no caso do gzip), sem montar o CSV inteiro como texto antes, e volta como o
+# próprio BytesIO, sem a cópia do getvalue(). A página só guarda as posições
+# das linhas; o arquivo é gerado quando alguém clica.
+LINHAS_POR_BLOCO = 50_000
+
+FORMATOS = {
+    'csv': ('CSV', '.csv', 'text/csv'),
+    'csv.gz': ('CSV compactado (gzip)', '.csv.gz', 'application/gzip'),
+    'parquet': ('Parquet', '.parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('Arrow IPC', '.arrow', 'application/vnd.apache.arrow.file'),
+}
+
+
+def _blocos(df, linhas_por_bloco):
+    for inicio in range(0, max(len(df), 1), linhas_por_bloco):
+        yield inicio, df.iloc[inicio:inicio + linhas_por_bloco]
+
+
+def escrever_csv(df, destino, linhas_por_bloco=LINHAS_POR_BLOCO):
+    texto = io.TextIOWrapper(destino, encoding='utf-8', newline='', write_through=True)
+    for inicio, bloco in _blocos(df, linhas_por_bloco):
+        bloco.to_csv(texto, index=False, header=inicio == 0)
+    texto.detach()
+
+
+def escrever_parquet(df, destino, linhas_por_bloco=LINHAS_POR_BLOCO):
+    escritor = None
+    for _, bloco in _blocos(df, linhas_por_bloco):
+        tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+        if escritor is None:
+            escritor = pq.ParquetWriter(destino, tabela.schema, compression='zstd')
+        escritor.write_table(tabela)
+    escritor.close()
+
+
+def escrever_arrow(df, destino, linhas_por_bloco=LINHAS_POR_BLOCO):
+    escritor = None
+    for _, bloco in _blocos(df, linhas_por_bloco):
+        tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+        if escritor is None:
+            escritor = pa.ipc.new_file(destino, tabela.schema)
+        escritor.write_table(tabela)
+    escritor.close()
+
+
+def exportar(df, formato):
+    destino = io.BytesIO()
+    if formato == 'csv':
+        escrever_csv(df, destino)
+    elif formato == 'csv.gz':
+        with gzip.GzipFile(fileobj=destino, mode='wb', compresslevel=3, mtime=0) as compactado:
+            escrever_csv(df, compactado)
+    elif formato == 'parquet':
+        escrever_parquet(df, destino)
+    elif formato == 'arrow':
+        escrever_arrow(df, destino)
+    else:
+        raise ValueError(f'formato de exportação desconhecido: {formato}')
+    destino.seek(0)
+    return destino
+
+
+def converter_csv(df):
+    return exportar(df, 'csv')
+
+
+# ====================================================================
+# EXPORTAÇÕES SOB DEMANDA  as mais recentes, dentro de um orçamento em bytes
+# ====================================================================
+_exportacoes = cache_limitado('exportacoes', orcamento_ambiente('DASHBOARD_CACHE_EXPORTACOES_MB', 128))
+
+
+def _chave(versao, linhas, colunas, formato):
+    # as linhas selecionadas entram como hash das posições, não como dados
+    posicoes = 'todas' if linhas is None else hashlib.blake2b(linhas.tobytes(), digest_size=16).hexdigest()
+    return versao, posicoes, tuple(colunas), formato
+
+
+def exportar_selecao(dados, versao, linhas, colunas, formato, estados=None):
+    chave = _chave(versao, linhas, colunas, formato)
+    conteudo = _exportacoes.consultar(chave)
+    if conteudo is not None:
+        REGISTRO.incrementar('exportacoes_total', formato=formato, resultado='hit')
+        return conteudo
+
+    with medir(f'exportar_{formato}'):
+        selecao = dados if linhas is None else dados.iloc[linhas]
+        if estados is not None and any(c in COLUNAS_COORDENADAS for c in colunas):
+            selecao = anexar_coordenadas(selecao, estados)
+        conteudo = exportar(selecao[colunas], formato)
+    REGISTRO.incrementar('exportacoes_total', formato=formato, resultado='miss')
+    registrar_tamanho(f'exportacao_{formato}', conteudo.getbuffer().nbytes)
+    _exportacoes.guardar(chave, conteudo)
+    return conteudo
@@ -0,0 +1,58 @@
+import pandas as pd
+
+# ====================================================================
+# DIMENSÃO ESTADO -> REGIÃO
+# ====================================================================
+REGIOES = ['Brasil', 'Centro-Oeste', 'Nordeste', 'Sudeste', 'Sul']
+
+ESTADO_REGIAO = {
+    'AC': 'Norte', 'AP': 'Norte', 'AM': 'Norte', 'PA': 'Norte',
+    'RO': 'Norte', 'RR': 'Norte', 'TO': 'Norte',
+    'AL': 'Nordeste', 'BA': 'Nordeste', 'CE': 'Nordeste', 'MA': 'Nordeste',
+    'PB': 'Nordeste', 'PE': 'Nordeste', 'PI': 'Nordeste', 'RN': 'Nordeste',
+    'SE': 'Nordeste',
+    'DF': 'Centro-Oeste', 'GO': 'Centro-Oeste', 'MT': 'Centro-Oeste', 'MS': 'Centro-Oeste',
+    'ES': 'Sudeste', 'MG': 'Sudeste', 'RJ': 'Sudeste', 'SP': 'Sudeste',
+    'PR': 'Sul', 'RS': 'Sul', 'SC': 'Sul',
+}
+
+
+def estados_da_regiao(regiao):
+    # '' ou 'Brasil' significa sem filtro de região
+    if not regiao or regiao == 'Brasil':
+        return None
+    regiao = regiao.lower()
+    return [uf for uf, nome in ESTADO_REGIAO.items() if nome.lower() == regiao]
+
+
+# ====================================================================
+# FILTRO LOCAL (substitui a requisição filtrada à API)
+# ====================================================================
+def filtrar_vendas(dados, regiao='', anos=None, vendedores=None):
+    mask = pd.Series(True, index=dados.index)
+
+    estados = estados_da_regiao(regiao)
+    if estados is not None:
+        mask &= dados['Local da compra'].isin(estados)
+
+    if anos:
+        mask &= dados['Data da Compra'].dt.year.isin([int(a) for a in anos])
+
+    if vendedores:
+        mask &= dados['Vendedor'].isin(vendedores)
+
+    if mask.all():
+        return dados
+    return dados.loc[mask]
+
+
+# ====================================================================
+# ASSINATURA DOS FILTROS  chave barata e canônica para o cache
+# ====================================================================
+def assinatura_filtros(regiao='', anos=None, vendedores=None, versao=''):
+    return (
+        regiao or '',
+        tuple(sorted(str(a) for a in anos or ())),
+        tuple(sorted(vendedores or ())),
+        versao,
+    )
@@ -0,0 +1,157 @@
+import pandas as pd
+import plotly.express as px
+
+from vendas.cubo import metricas_gerais, por_categoria, por_estado, por_mes, ranking_vendedores
+from vendas.filtros import filtrar_vendas
+from vendas.instrumentacao import medir
+
+
+# ====================================================================
+# TABELAS DO DASHBOARD (sem dependência do Streamlit)
+# ====================================================================
+def criar_tabelas(base, assinatura):
+    regiao, anos, vendedores, _ = assinatura
+    cubo_filtrado = filtrar_vendas(base.cubo, regiao, anos, vendedores)
+    if cubo_filtrado.empty:
+        return {}
+
+    estados = base.estados
+    with medir('tabelas'):
+        return {
+            'metricas': metricas_gerais(cubo_filtrado),
+            'receita_estados': por_estado(cubo_filtrado, estados, 'Preço'),
+            'receita_mensal': por_mes(cubo_filtrado, 'Preço'),
+            'receita_categorias': por_categoria(cubo_filtrado, 'Preço'),
+            'vendas_estados': por_estado(cubo_filtrado, estados, 'Contagem'),
+            'vendas_mensal': por_mes(cubo_filtrado, 'Contagem'),
+            'vendas_categorias': por_categoria(cubo_filtrado, 'Contagem').reset_index(),
+            'vendedores': ranking_vendedores(cubo_filtrado),
+        }
+
+
+# ====================================================================
+# GRÁFICOS POR ABA  cada aba monta só as figuras que mostra
+# ====================================================================
+def graficos_receita(tabelas):
+    receita_estados = tabelas['receita_estados']
+    receita_mensal = tabelas['receita_mensal']
+    receita_categorias = tabelas['receita_categorias']
+
+    with medir('figuras_receita'):
+        RECEITA_MIN = receita_mensal['Preço'].min()
+        RECEITA_MAX = receita_mensal['Preço'].max()
+
+        fig_mapa_receita = px.scatter_geo(
+            receita_estados,
+            lat='lat', lon='lon', scope='south america', size='Preço', template='seaborn',
+            hover_name='Local da compra', hover_data={'lat': False, 'lon': False},
+            title='Receita por Estado',
+        )
+        fig_receita_mensal = px.line(
+            receita_mensal, x='Mes', y='Preço', markers=True,
+            range_y=(RECEITA_MIN * 0.9, RECEITA_MAX * 1.1), color='Ano', line_dash='Ano',
+            title='Receita Mensal',
+        )
+        fig_receita_mensal.update_layout(yaxis_title='Receita')
+        fig_receita_estados = px.bar(
+            receita_estados.head(), x='Local da compra', y='Preço', text_auto=True,
+            title='Top Estados Receita',
+        )
+        fig_receita_estados.update_layout(yaxis_title='Receita')
+        fig_receitas_categorias = px.bar(
+            receita_categorias, text_auto=True, title='Receita por Categorias',
+        )
+        fig_receitas_categorias.update_layout(yaxis_title='Receita')
+
+    return fig_mapa_receita, fig_receita_mensal, fig_receita_estados, fig_receitas_categorias
+
+
+def graficos_quantidade(tabelas):
+    vendas_estados = tabelas['vendas_estados']
+    vendas_mensal = tabelas['vendas_mensal']
+    vendas_categorias = tabelas['vendas_categorias']
+
+    with medir('figuras_quantidade'):
+        VENDAS_MIN = vendas_mensal['Contagem'].min()
+        VENDAS_MAX = vendas_mensal['Contagem'].max()
+
+        fig_mapa_vendas = px.scatter_geo(
+            vendas_estados,
+            lat='lat', lon='lon', scope='south america', size='Contagem', template='seaborn',
+            hover_name='Local da compra', hover_data={'lat': False, 'lon': False},
+            title='Quantidade de Vendas por Estado',
+        )
+        fig_vendas_mensal = px.line(
+            vendas_mensal, x='Mes', y='Contagem', markers=True,
+            range_y=((VENDAS_MIN - 20), VENDAS_MAX + 20), color='Ano', line_dash='Ano',
+            title='Quantidade de Vendas Mensais',
+        )
+        fig_vendas_mensal.update_layout(yaxis_title='Quantidade de Vendas')
+        fig_vendas_estados = px.bar(
+            vendas_estados.head(), x='Local da compra', y='Contagem', text_auto=True,
+            title='Top Estados Quantidade de Vendas',
+        )
+        fig_vendas_estados.update_layout(yaxis_title='Quantidade de Vendas')
+        fig_vendas_categorias = px.bar(
+            vendas_categorias, x='Contagem', y='Categoria do Produto', text_auto=True,
+            title='Quantidade de Vendas por Categoria',
+        )
+        fig_vendas_categorias.update_layout(xaxis_title='Quantidade de Vendas', yaxis_title='Categoria')
+
+    return fig_mapa_vendas, fig_vendas_mensal, fig_vendas_estados, fig_vendas_categorias
+
+
+def criar_tabelas_e_graficos(base, assinatura):
+    # tudo de uma vez, como antes da divisão por aba (usado nos benchmarks)
+    tabelas = criar_tabelas(base, assinatura)
+    if not tabelas:
+        return (
+            {}, pd.DataFrame(),
+            None, None, None, None,
+            None, None, None, None,
+        )
+    return (
+        tabelas['metricas'], tabelas['vendedores'],
+        *graficos_receita(tabelas),
+        *graficos_quantidade(tabelas),
+    )
+
+
+# ====================================================================
+# TOP-N VENDEDORES (aba Vendedores)
+# ====================================================================
+def graficos_vendedores(ranking, qtd_vendedores):
+    top_receita = ranking.por_receita.iloc[:qtd_vendedores]
+    fig_receita_vendedores = px.bar(
+        top_receita,
+        x='Receita',
+        y='Vendedor',
+        text_auto=True,
+        labels={'Receita': 'sum'},
+        title=f'Top{qtd_vendedores} vendedores receita',
+    )
+
+    df_top = ranking.por_quantidade.iloc[:qtd_vendedores]
+
+    media_vals = df_top['MediaAvaliacao'].round(2)
+    text_vals = media_vals.where(~media_vals.isna(), other='Sem dados').astype(str)
+
+    fig_vendas_vendedores = px.bar(
+        df_top,
+        x='Quantidade',
+        y='Vendedor',
+        orientation='h',
+        title=f'Top{qtd_vendedores} vendedores quantidade com média ao final da barra',
+        hover_data={'MediaAvaliacao': ':.2f'},
+    )
+    fig_vendas_vendedores.update_traces(
+        text=text_vals,
+        texttemplate='Média: %{text}',
+        textposition='outside',
+    )
+    fig_vendas_vendedores.update_layout(
+        xaxis_title='Quantidade de vendas',
+        yaxis_title='Vendedor',
+    )
+
+    return fig_receita_vendedores, fig_vendas_vendedores
@@ -0,0 +1,141 @@
+from typing import NamedTuple
+
+import numpy as np
+
+# ====================================================================
+# ÍNDICES DE FILTRO  montados uma vez por versão dos dados
+# ====================================================================
+# Produto: lista das linhas de cada código. Preço e data: valores ordenados
+# com a posição original, consultados por searchsorted. Cada filtro estima
+# quantas linhas seleciona sem varrer a coluna; o mais seletivo fornece as
+# candidatas e os outros só são testados nelas (se nenhum for seletivo, as
+# colunas são varridas uma vez, em numpy). Filtro que seleciona tudo
+# é ignorado, e sem nenhum filtro ativo o resultado é None (todas as linhas).
+class IndiceOrdenado(NamedTuple):
+    coluna: np.ndarray     # valores na ordem original das linhas
+    valores: np.ndarray    # valores ordenados, nulos no fim
+    posicoes: np.ndarray   # linha de cada valor ordenado
+    validos: int           # quantidade de valores não nulos
+
+    def intervalo(self, inicio, fim):
+        # fatia [a, b) dos valores ordenados com inicio <= valor <= fim
+        valores = self.valores[:self.validos]
+        return (
+            int(np.searchsorted(valores, inicio, side='left')),
+            int(np.searchsorted(valores, fim, side='right')),
+        )
+
+    def limites(self):
+        # menor e maior valor não nulo; None quando a coluna só tem nulos
+        if not self.validos:
+            return None
+        return self.valores[0], self.valores[self.validos - 1]
+
+
+class IndiceFiltros(NamedTuple):
+    total: int
+    categorias_produto: object
+    codigos_produto: np.ndarray
+    linhas_produto: list
+    preco: IndiceOrdenado
+    data: IndiceOrdenado
+
+    def produtos(self):
+        # nomes com ao menos uma linha, para as opções do filtro
+        return sorted(p for p, linhas in zip(self.categorias_produto, self.linhas_produto) if len(linhas))
+
+
+def tipo_posicao(total):
+    return np.int32 if total < 2 ** 31 else np.int64
+
+
+def _indice_ordenado(coluna, nulos):
+    posicoes = np.argsort(coluna, kind='stable').astype(tipo_posicao(len(coluna)))
+    return IndiceOrdenado(coluna, coluna[posicoes], posicoes, len(coluna) - int(nulos.sum()))
+
+
+def montar_indice(dados):
+    total = len(dados)
+    produto = dados['Produto'].astype('category')
+    codigos = produto.cat.codes.to_numpy()
+    quantidade = len(produto.cat.categories)
+
+    # mesma técnica das partições do cubo: ordena os códigos e corta
+    ordem = np.argsort(codigos, kind='stable').astype(tipo_posicao(total))
+    contagem = np.bincount(codigos[codigos >= 0], minlength=quantidade)
+    inicio = int((codigos < 0).sum())  # nulos (código -1) ficam no começo
+    limites = inicio + np.cumsum(contagem)[:-1]
+    linhas_produto = np.split(ordem[inicio:], limites - inicio)
+
+    preco = dados['Preço'].to_numpy('float64')
+    data = dados['Data da Compra'].to_numpy()
+    return IndiceFiltros(
+        total=total,
+        categorias_produto=produto.cat.categories,
+        codigos_produto=codigos,
+        linhas_produto=linhas_produto,
+        preco=_indice_ordenado(preco, np.isnan(preco)),
+        data=_indice_ordenado(data, np.isnat(data)),
+    )
+
+
+def _restricao_produtos(indice, produtos):
+    codigos = indice.categorias_produto.get_indexer(list(produtos))
+    codigos = np.unique(codigos[codigos >= 0])
+    # posição extra no fim: o código -1 (produto nulo) cai nela e nunca passa
+    selecionado = np.zeros(len(indice.categorias_produto) + 1, dtype=bool)
+    selecionado[codigos] = True
+
+    quantidade = sum(len(indice.linhas_produto[c]) for c in codigos)
+    if quantidade == indice.total:
+        return None
+    return (
+        quantidade,
+        lambda: np.concatenate([indice.linhas_produto[c] for c in codigos]) if len(codigos) else codigos,
+        lambda linhas: selecionado[indice.codigos_produto[linhas]],
+    )
+
+
+def _restricao_intervalo(ordenado, inicio, fim, total):
+    a, b = ordenado.intervalo(inicio, fim)
+    if b - a == total:
+        return None
+    return (
+        b - a,
+        lambda: ordenado.posicoes[a:b],
+        lambda linhas: (ordenado.coluna[linhas] >= inicio) & (ordenado.coluna[linhas] <= fim),
+    )
+
+
+def filtrar_linhas(indice, produtos=None, preco=None, datas=None):
+    # produtos: lista de nomes; preco e datas: (início, fim), inclusivos
+    restricoes = []
+    if produtos:
+        restricoes.append(_restricao_produtos(indice, produtos))
+    if preco is not None:
+        restricoes.append(_restricao_intervalo(indice.preco, preco[0], preco[1], indice.total))
+    if datas is not None:
+        # na mesma unidade da coluna; senão o numpy converteria a coluna inteira
+        inicio, fim = (np.datetime64(d).astype(indice.data.valores.dtype) for d in datas)
+        restricoes.append(_restricao_intervalo(indice.data, inicio, fim, indice.total))
+
+    restricoes = sorted((r for r in restricoes if r is not None), key=lambda r: r[0])
+    if not restricoes:
+        return None
+
+    quantidade, candidatas, _ = restricoes[0]
+    if quantidade > indice.total // 16:
+        # pouco seletivo: uma varredura sequencial das colunas sai mais barata
+        # que testar posições espalhadas
+        mascara = restricoes[0][2](slice(None))
+        for _, _, testar in restricoes[1:]:
+            mascara &= testar(slice(None))
+        return np.flatnonzero(mascara)
+
+    linhas = candidatas()
+    for _, _, testar in restricoes[1:]:
+        if not len(linhas):
+            break
+        linhas = linhas[testar(linhas)]
+    # na ordem original das linhas, como a máscara booleana devolvia
+    return np.sort(linhas)
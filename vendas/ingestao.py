@@ -0,0 +1,140 @@
+import io
+import json
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json
+import requests
+
+# ====================================================================
+# INGESTÃO DO JSON DA API
+# ====================================================================
+FORMATO_DATA = '%d/%m/%Y'
+
+ESQUEMA_LABDADOS = pa.schema([
+    ('Produto', pa.string()),
+    ('Categoria do Produto', pa.string()),
+    ('Preço', pa.float64()),
+    ('Frete', pa.float64()),
+    ('Data da Compra', pa.string()),
+    ('Vendedor', pa.string()),
+    ('Local da compra', pa.string()),
+    ('Avaliação da compra', pa.int64()),
+    ('Tipo de pagamento', pa.string()),
+    ('Quantidade de parcelas', pa.int64()),
+    ('lat', pa.float64()),
+    ('lon', pa.float64()),
+])
+
+class RespostaInvalida(requests.exceptions.RequestException):
+    # corpo que não é a lista de vendas (ex.: página de erro com status 200);
+    # as páginas já tratam RequestException como erro de conexão
+    pass
+
+
+_SEPARADOR_REGISTROS = re.compile(rb'\}\s*,\s*\{')
+_ESPACOS = b' \t\r\n'
+BLOCO_LEITURA = 1 << 20
+
+
+def ler_dados_json(conteudo):
+    # caminho original: grafo de objetos Python + from_dict + to_datetime
+    df = pd.DataFrame.from_dict(json.loads(conteudo))
+    df['Data da Compra'] = pd.to_datetime(df['Data da Compra'], format=FORMATO_DATA)
+    return df
+
+
+class _FluxoNdjson(io.RawIOBase):
+    # A API devolve uma lista de objetos planos; o leitor do Arrow quer um
+    # objeto por linha. O corpo é lido por memoryview, um bloco por vez, e só
+    # o bloco atual é reescrito: nenhuma cópia do corpo inteiro. Um separador
+    # dentro de texto quebraria a linha e o Arrow recusaria o JSON, caindo no
+    # caminho original.
+    def __init__(self, conteudo, tamanho_bloco=BLOCO_LEITURA):
+        corpo = memoryview(conteudo)
+        inicio, fim = 0, len(corpo)
+        while inicio < fim and corpo[inicio] in _ESPACOS:
+            inicio += 1
+        while fim > inicio and corpo[fim - 1] in _ESPACOS:
+            fim -= 1
+        if fim - inicio < 2 or corpo[inicio] != ord('[') or corpo[fim - 1] != ord(']'):
+            raise ValueError('resposta não é uma lista JSON')
+        self._corpo = corpo[inicio + 1:fim - 1]
+        self._tamanho_bloco = tamanho_bloco
+        self._posicao = 0
+        self._pendente = b''
+        self._saida = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def _proximo_bloco(self):
+        fim = min(self._posicao + self._tamanho_bloco, len(self._corpo))
+        bloco = self._pendente + self._corpo[self._posicao:fim]
+        self._posicao = fim
+        self._pendente = b''
+        if fim < len(self._corpo):
+            # corta na última '}': um separador que começa antes dela também
+            # termina antes, então o que fica para o próximo bloco não tem
+            # separador pela metade
+            corte = bloco.rfind(b'}')
+            if corte <= 0:
+                self._pendente = bloco
+                return b''
+            self._pendente = bloco[corte:]
+            bloco = bloco[:corte]
+        return _SEPARADOR_REGISTROS.sub(b'}\n{', bloco)
+
+    def readinto(self, destino):
+        while not self._saida:
+            if self._posicao >= len(self._corpo) and not self._pendente:
+                return 0
+            self._saida = memoryview(self._proximo_bloco())
+        n = min(len(destino), len(self._saida))
+        destino[:n] = self._saida[:n]
+        self._saida = self._saida[n:]
+        return n
+
+
+def _converter_datas(coluna):
+    # cada texto de data distinto é convertido uma vez e depois replicado
+    codificada = coluna.combine_chunks()
+    unicas = pd.to_datetime(codificada.dictionary.to_pandas(), format=FORMATO_DATA)
+    # data nula vira o código -1, que o take preenche com NaT
+    codigos = pc.fill_null(codificada.indices, -1).to_numpy()
+    return pd.Series(unicas.array.take(codigos, allow_fill=True))
+
+
+def _codificar_textos(lote):
+    # textos viram dicionário (categorical) a cada bloco lido: o texto por
+    # linha nunca existe para a tabela inteira
+    colunas = [pc.dictionary_encode(c) if pa.types.is_string(c.type) else c for c in lote.columns]
+    return pa.RecordBatch.from_arrays(colunas, names=lote.schema.names)
+
+
+def ler_dados_colunar(conteudo):
+    opcoes = pa.json.ParseOptions(explicit_schema=ESQUEMA_LABDADOS, unexpected_field_behavior='infer')
+    leitor = pa.json.open_json(
+        _FluxoNdjson(conteudo),
+        read_options=pa.json.ReadOptions(block_size=BLOCO_LEITURA),
+        parse_options=opcoes,
+    )
+    tabela = pa.Table.from_batches([_codificar_textos(lote) for lote in leitor]).unify_dictionaries()
+    datas = _converter_datas(tabela.column('Data da Compra'))
+
+    df = tabela.drop_columns(['Data da Compra']).to_pandas()
+    df.insert(tabela.schema.get_field_index('Data da Compra'), 'Data da Compra', datas)
+    return df
+
+
+def ler_dados(conteudo):
+    try:
+        return ler_dados_colunar(conteudo)
+    except (pa.ArrowInvalid, ValueError):
+        pass
+    try:
+        return ler_dados_json(conteudo)
+    except (ValueError, KeyError, TypeError) as e:
+        raise RespostaInvalida(f'a API não devolveu uma lista de vendas ({e})') from e
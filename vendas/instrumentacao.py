@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# ====================================================================
+# INSTRUMENTAÇÃO  tempos por etapa, contadores, medidores e tamanhos de payload
+# ====================================================================
+# REGISTRO acumula tudo no processo (para exportar no formato Prometheus);
+# cada rerun tem sua Execucao, guardada na thread do script, que alimenta
+# o painel de depuração e o log estruturado.
+logger = logging.getLogger('dashboard_vendas.desempenho')
+
+DEBUG = os.environ.get('DASHBOARD_DEBUG', '') == '1'
+ARQUIVO_METRICAS = os.environ.get('DASHBOARD_METRICAS_ARQUIVO')
+# o arquivo de métricas é regravado no máximo uma vez por intervalo
+INTERVALO_EXPORTACAO = float(os.environ.get('DASHBOARD_METRICAS_INTERVALO', 10))
+
+_local = threading.local()
+
+
+def _rotulos(rotulos):
+    return tuple(sorted(rotulos.items()))
+
+
+class Registro:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tempos = defaultdict(lambda: [0, 0.0])
+        self.contadores = defaultdict(int)
+        self.tamanhos = {}
+        self.medidores = {}
+
+    def registrar_tempo(self, etapa, segundos):
+        with self._lock:
+            acumulado = self.tempos[etapa]
+            acumulado[0] += 1
+            acumulado[1] += segundos
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        with self._lock:
+            self.contadores[(nome, _rotulos(rotulos))] += valor
+
+    def registrar_tamanho(self, nome, tamanho):
+        with self._lock:
+            self.tamanhos[nome] = tamanho
+
+    def definir(self, nome, valor, **rotulos):
+        with self._lock:
+            self.medidores[(nome, _rotulos(rotulos))] = valor
+
+    def prometheus(self):
+        linhas = [
+            '# TYPE dashboard_etapa_segundos summary',
+        ]
+        with self._lock:
+            for etapa, (quantidade, total) in sorted(self.tempos.items()):
+                linhas.append(f'dashboard_etapa_segundos_count{{etapa="{etapa}"}} {quantidade}')
+                linhas.append(f'dashboard_etapa_segundos_sum{{etapa="{etapa}"}} {total:.6f}')
+            nomes = sorted({nome for nome, _ in self.contadores})
+            for nome in nomes:
+                linhas.append(f'# TYPE dashboard_{nome} counter')
+                for (n, rotulos), valor in sorted(self.contadores.items()):
+                    if n == nome:
+                        texto = ','.join(f'{k}="{v}"' for k, v in rotulos)
+                        linhas.append(f'dashboard_{nome}{{{texto}}} {valor}')
+            if self.tamanhos:
+                linhas.append('# TYPE dashboard_payload_bytes gauge')
+                for nome, tamanho in sorted(self.tamanhos.items()):
+                    linhas.append(f'dashboard_payload_bytes{{payload="{nome}"}} {tamanho}')
+            for nome in sorted({nome for nome, _ in self.medidores}):
+                linhas.append(f'# TYPE dashboard_{nome} gauge')
+                for (n, rotulos), valor in sorted(self.medidores.items()):
+                    if n == nome:
+                        texto = ','.join(f'{k}="{v}"' for k, v in rotulos)
+                        linhas.append(f'dashboard_{nome}{{{texto}}} {valor}')
+        return '\n'.join(linhas) + '\n'
+
+
+REGISTRO = Registro()
+
+
+class Execucao:
+    def __init__(self, pagina):
+        self.pagina = pagina
+        self.inicio = time.perf_counter()
+        self.etapas = []
+        self.caches = {}
+        self.tamanhos = {}
+
+
+def iniciar_execucao(pagina):
+    _local.execucao = Execucao(pagina)
+    return _local.execucao
+
+
+def execucao_atual():
+    return getattr(_local, 'execucao', None)
+
+
+@contextmanager
+def medir(etapa):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        REGISTRO.registrar_tempo(etapa, segundos)
+        execucao = execucao_atual()
+        if execucao is not None:
+            execucao.etapas.append((etapa, segundos))
+
+
+def registrar_miss():
+    # chamado por CacheLimitado.consultar quando a chave não está no cache
+    _local.miss = True
+
+
+@contextmanager
+def medir_cache(nome):
+    _local.miss = False
+    with medir(nome):
+        yield
+    resultado = 'miss' if _local.miss else 'hit'
+    REGISTRO.incrementar('cache_consultas_total', funcao=nome, resultado=resultado)
+    execucao = execucao_atual()
+    if execucao is not None:
+        execucao.caches[nome] = resultado
+
+
+def registrar_tamanho(nome, tamanho):
+    # dentro de um rerun soma os payloads; o total vai ao REGISTRO no fim
+    execucao = execucao_atual()
+    if execucao is None:
+        REGISTRO.registrar_tamanho(nome, tamanho)
+    else:
+        execucao.tamanhos[nome] = execucao.tamanhos.get(nome, 0) + tamanho
+
+
+def exportar_prometheus():
+    return REGISTRO.prometheus()
+
+
+_lock_exportacao = threading.Lock()
+_ultima_exportacao = None
+
+
+def gravar_metricas(arquivo=ARQUIVO_METRICAS, forcar=False):
+    # formato de textfile do node_exporter: grava num temporário único da
+    # mesma pasta e troca atomicamente. Uma sessão grava por vez, e as demais
+    # não esperam; falha de disco só vai para o log, nunca para a página.
+    global _ultima_exportacao
+    if not arquivo or not _lock_exportacao.acquire(blocking=False):
+        return False
+    temporario = None
+    try:
+        agora = time.monotonic()
+        if not forcar and _ultima_exportacao is not None and agora - _ultima_exportacao < INTERVALO_EXPORTACAO:
+            return False
+        descritor, temporario = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(arquivo)), prefix=f'.{os.path.basename(arquivo)}.', suffix='.tmp'
+        )
+        with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+            f.write(exportar_prometheus())
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, arquivo)
+        temporario = None
+        _ultima_exportacao = agora
+        return True
+    except OSError as e:
+        logger.warning('Não foi possível gravar as métricas em %s: %s', arquivo, e)
+        return False
+    finally:
+        if temporario is not None:
+            try:
+                os.remove(temporario)
+            except OSError:
+                pass
+        _lock_exportacao.release()
+
+
+def finalizar_execucao():
+    execucao = execucao_atual()
+    if execucao is None:
+        return None
+    total = time.perf_counter() - execucao.inicio
+    REGISTRO.registrar_tempo(f'rerun_{execucao.pagina}', total)
+    REGISTRO.incrementar('reruns_total', pagina=execucao.pagina)
+    for nome, tamanho in execucao.tamanhos.items():
+        REGISTRO.registrar_tamanho(nome, tamanho)
+
+    etapas = defaultdict(float)
+    for nome, segundos in execucao.etapas:
+        etapas[nome] += segundos
+
+    logger.info(json.dumps({
+        'pagina': execucao.pagina,
+        'total_s': round(total, 6),
+        'etapas': {nome: round(s, 6) for nome, s in etapas.items()},
+        'caches': execucao.caches,
+        'tamanhos': execucao.tamanhos,
+    }, ensure_ascii=False))
+
+    _local.execucao = None
+    gravar_metricas()
+    return total
@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from itertools import combinations
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.ipc
+
+from vendas import graficos
+from vendas.cliente import URL_LABDADOS
+from vendas.cubo import RankingVendedores
+from vendas.filtros import REGIOES, assinatura_filtros
+from vendas.repositorio import carregar_dados_brutos
+from vendas.snapshot import DIRETORIO_SNAPSHOT, carregar_snapshot
+
+# ====================================================================
+# AGREGADOS MATERIALIZADOS  tabelas do dashboard calculadas fora do app
+# ====================================================================
+# Um comando em lote (python -m vendas.materializacao) calcula as tabelas de
+# criar_tabelas para cada região x subconjunto de anos, sem filtro de
+# vendedor, e grava num SQLite: uma linha por (versão, assinatura, tabela),
+# com os DataFrames em Arrow IPC. O dashboard consulta esse arquivo antes
+# de calcular; se a versão dos dados não bater, calcula ao vivo.
+ARQUIVO_AGREGADOS = Path(os.environ.get('DASHBOARD_AGREGADOS', DIRETORIO_SNAPSHOT / 'agregados.sqlite'))
+
+_ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS agregados (
+    versao TEXT NOT NULL,
+    assinatura TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    conteudo BLOB NOT NULL,
+    PRIMARY KEY (versao, assinatura, nome)
+)
+'''
+# linha gravada quando os filtros não têm vendas (criar_tabelas devolve {})
+_VAZIO = ''
+
+
+def chave_assinatura(assinatura):
+    regiao, anos, vendedores, _ = assinatura
+    return json.dumps([regiao, list(anos), list(vendedores)], ensure_ascii=False)
+
+
+def _para_ipc(df):
+    tabela = pa.Table.from_pandas(df)
+    destino = pa.BufferOutputStream()
+    with pa.ipc.new_stream(destino, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    return destino.getvalue().to_pybytes()
+
+
+def _de_ipc(conteudo):
+    return pa.ipc.open_stream(conteudo).read_all().to_pandas()
+
+
+def serializar_tabelas(tabelas):
+    if not tabelas:
+        return [(_VAZIO, b'')]
+    linhas = []
+    for nome, valor in tabelas.items():
+        if nome == 'metricas':
+            linhas.append((nome, json.dumps(valor).encode('utf-8')))
+        elif isinstance(valor, RankingVendedores):
+            linhas.extend((f'{nome}.{campo}', _para_ipc(df)) for campo, df in valor._asdict().items())
+        else:
+            linhas.append((nome, _para_ipc(valor)))
+    return linhas
+
+
+def desserializar_tabelas(linhas):
+    tabelas, ranking = {}, {}
+    for nome, conteudo in linhas:
+        if nome == _VAZIO:
+            continue
+        if nome == 'metricas':
+            tabelas[nome] = json.loads(conteudo)
+        elif '.' in nome:
+            tabela, campo = nome.split('.', 1)
+            ranking.setdefault(tabela, {})[campo] = _de_ipc(conteudo)
+        else:
+            tabelas[nome] = _de_ipc(conteudo)
+    for tabela, campos in ranking.items():
+        tabelas[tabela] = RankingVendedores(**campos)
+    return tabelas
+
+
+# ====================================================================
+# LEITURA  usada pelo dashboard
+# ====================================================================
+def ler_tabelas(versao, assinatura, arquivo=ARQUIVO_AGREGADOS):
+    # None quando não há agregado para esta versão e filtros
+    if assinatura[2] or not Path(arquivo).exists():
+        return None
+    try:
+        conexao = sqlite3.connect(f'file:{arquivo}?mode=ro', uri=True)
+        try:
+            linhas = conexao.execute(
+                'SELECT nome, conteudo FROM agregados WHERE versao = ? AND assinatura = ?',
+                (versao, chave_assinatura(assinatura)),
+            ).fetchall()
+        finally:
+            conexao.close()
+    except sqlite3.Error:
+        # arquivo em gravação ou corrompido: o dashboard calcula ao vivo
+        return None
+    if not linhas:
+        return None
+    return desserializar_tabelas(linhas)
+
+
+# ====================================================================
+# MATERIALIZAÇÃO  roda em lote, depois de cada atualização dos dados
+# ====================================================================
+def assinaturas_para(base):
+    anos = base.anos
+    subconjuntos = [s for n in range(len(anos) + 1) for s in combinations(anos, n)]
+    for regiao in REGIOES:
+        for subconjunto in subconjuntos:
+            yield assinatura_filtros('' if regiao == 'Brasil' else regiao, subconjunto, None, base.versao)
+
+
+def materializar(base, arquivo=ARQUIVO_AGREGADOS):
+    Path(arquivo).parent.mkdir(parents=True, exist_ok=True)
+    conexao = sqlite3.connect(arquivo)
+    try:
+        conexao.execute(_ESQUEMA)
+        quantidade = 0
+        # uma transação só: quem lê vê a versão anterior ou a nova inteira
+        with conexao:
+            conexao.execute('DELETE FROM agregados WHERE versao <> ?', (base.versao,))
+            for assinatura in assinaturas_para(base):
+                chave = chave_assinatura(assinatura)
+                conexao.executemany(
+                    'INSERT OR REPLACE INTO agregados VALUES (?, ?, ?, ?)',
+                    [(base.versao, chave, nome, conteudo)
+                     for nome, conteudo in serializar_tabelas(graficos.criar_tabelas(base, assinatura))],
+                )
+                quantidade += 1
+        conexao.execute('VACUUM')
+    finally:
+        conexao.close()
+    return quantidade
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pré-calcula as tabelas do dashboard para todos os filtros de região e ano.')
+    parser.add_argument('--url', default=URL_LABDADOS, help='endereço da API (padrão: LABDADOS_URL)')
+    parser.add_argument('--snapshot', action='store_true', help='usa o snapshot em disco em vez de baixar da API')
+    parser.add_argument('--arquivo', default=ARQUIVO_AGREGADOS, type=Path)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    if args.snapshot:
+        carregado = carregar_snapshot()
+        if carregado is None:
+            parser.error(f'nenhum snapshot em {DIRETORIO_SNAPSHOT}')
+        base = carregado[0]
+    else:
+        base = carregar_dados_brutos(args.url)
+
+    quantidade = materializar(base, args.arquivo)
+    print(
+        f'{quantidade} combinações de filtros da versão {base.versao} gravadas em {args.arquivo} '
+        f'({args.arquivo.stat().st_size / 1024:.0f} KiB, {time.perf_counter() - inicio:.1f} s)'
+    )
+
+
+if __name__ == '__main__':
+    main()
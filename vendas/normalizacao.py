@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from vendas.cubo import coordenadas_estados
+
+# ====================================================================
+# REPRESENTAÇÃO COMPACTA DOS DADOS
+# ====================================================================
+COLUNAS_CATEGORICAS = [
+    'Produto', 'Categoria do Produto', 'Vendedor', 'Local da compra', 'Tipo de pagamento',
+]
+# lat/lon se repetem em toda linha do mesmo estado; ficam só na tabela de estados
+COLUNAS_COORDENADAS = ['lat', 'lon']
+
+
+def uso_memoria(dados):
+    return int(dados.memory_usage(deep=True).sum())
+
+
+def reduzir_numerico(serie):
+    if pd.api.types.is_integer_dtype(serie):
+        return pd.to_numeric(serie, downcast='integer')
+    if pd.api.types.is_float_dtype(serie):
+        # só reduz para float32 se não perder nenhum valor
+        candidata = serie.astype('float32')
+        if np.array_equal(candidata.to_numpy('float64'), serie.to_numpy('float64'), equal_nan=True):
+            return candidata
+    return serie
+
+
+def normalizar_dados(dados):
+    antes = uso_memoria(dados)
+
+    estados = coordenadas_estados(dados)
+    compacto = dados.drop(columns=[c for c in COLUNAS_COORDENADAS if c in dados.columns])
+
+    for coluna in compacto.columns:
+        if coluna in COLUNAS_CATEGORICAS:
+            compacto[coluna] = compacto[coluna].astype('category')
+        elif pd.api.types.is_numeric_dtype(compacto[coluna]):
+            compacto[coluna] = reduzir_numerico(compacto[coluna])
+
+    memoria = {'antes': antes, 'depois': uso_memoria(compacto) + uso_memoria(estados)}
+    return compacto, estados, memoria
+
+
+def anexar_coordenadas(dados, estados):
+    # reconstrói lat/lon só para as linhas pedidas (ex.: visualização ou download);
+    # a tabela de estados está na ordem dos códigos, então basta indexar por eles
+    codigos = dados['Local da compra'].cat.codes.to_numpy()
+    return dados.assign(**{
+        c: np.where(codigos >= 0, estados[c].to_numpy('float64')[codigos], np.nan)
+        for c in COLUNAS_COORDENADAS
+    })
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from vendas.indices import tipo_posicao
+
+# ====================================================================
+# PAGINAÇÃO NO SERVIDOR  ordena e fatia antes de enviar ao navegador
+# ====================================================================
+TAMANHOS_PAGINA = [50, 100, 250, 500, 1000]
+
+
+def ordem_por_coluna(dados, coluna, ascendente=True):
+    # posições das linhas ordenadas pela coluna; nulos sempre no fim.
+    # int32 até 2**31 linhas: metade da memória de cada ordem guardada
+    valores = dados[coluna]
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        # categorias em ordem alfabética: ordenar os códigos já basta
+        valores = valores.cat.reorder_categories(sorted(valores.cat.categories))
+    return valores.reset_index(drop=True).sort_values(
+        ascending=ascendente, kind='stable', na_position='last'
+    ).index.to_numpy().astype(tipo_posicao(len(dados)))
+
+
+def restringir_ordem(ordem, linhas, total):
+    # mantém a ordem global só para as linhas selecionadas, sem reordenar
+    selecionadas = np.zeros(total, dtype=bool)
+    selecionadas[linhas] = True
+    return ordem[selecionadas[ordem]]
+
+
+def fatiar_pagina(dados, posicoes, tamanho, numero):
+    # posicoes None: ordem original, sem filtro; a página é uma fatia direta
+    inicio = (numero - 1) * tamanho
+    if posicoes is None:
+        return dados.iloc[inicio:inicio + tamanho]
+    return dados.iloc[posicoes[inicio:inicio + tamanho]]
+
+
+def total_paginas(quantidade, tamanho):
+    return max(1, -(-quantidade // tamanho))
@@ -0,0 +1,49 @@
+import pandas as pd
+import streamlit as st
+
+from vendas import instrumentacao
+from vendas.cache import CACHES
+
+# ====================================================================
+# PAINEL DE DESEMPENHO  ative com ?debug=1 ou DASHBOARD_DEBUG=1
+# ====================================================================
+def debug_ativo():
+    return instrumentacao.DEBUG or st.query_params.get('debug') == '1'
+
+
+def finalizar_com_painel():
+    execucao = instrumentacao.execucao_atual()
+    total = instrumentacao.finalizar_execucao()
+    if execucao is None or not debug_ativo():
+        return
+
+    with st.sidebar.expander('Desempenho', expanded=True):
+        st.caption(f'Rerun completo: {total * 1000:.1f} ms')
+        etapas = (
+            pd.DataFrame(execucao.etapas, columns=['Etapa', 'Segundos'])
+            .groupby('Etapa', sort=False)['Segundos'].agg(['sum', 'size'])
+        )
+        etapas = pd.DataFrame({'ms': (etapas['sum'] * 1000).round(2), 'Chamadas': etapas['size']})
+        st.dataframe(etapas, width='stretch')
+
+        if execucao.caches:
+            st.markdown('**Cache**')
+            st.json(execucao.caches)
+        if CACHES:
+            # acumulado no processo: ocupação, acertos e remoções por cache
+            st.markdown('**Caches com orçamento**')
+            estatisticas = pd.DataFrame([cache.estatisticas() for cache in CACHES.values()])
+            st.dataframe(estatisticas.set_index('cache'), width='stretch')
+        if execucao.tamanhos:
+            st.markdown('**Payloads (bytes)**')
+            st.json(execucao.tamanhos)
+
+        st.markdown('**Prometheus**')
+        st.code(instrumentacao.exportar_prometheus(), language='text')
+
+
+def interromper_com_painel():
+    # st.stop() encerra o script: registra o rerun antes, senão ele some das
+    # métricas e a Execucao fica pendurada na thread
+    finalizar_com_painel()
+    st.stop()
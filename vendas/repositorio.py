@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import threading
+import time
+
+import streamlit as st
+
+from vendas.base import montar_base
+from vendas.carga_particionada import (
+    CARGA_PARTICIONADA,
+    VARREDURA_A_CADA,
+    buscar_particionado,
+    particoes_da_base,
+)
+from vendas.cliente import URL_LABDADOS, ClienteLabdados
+from vendas.ingestao import ler_dados
+from vendas.instrumentacao import REGISTRO, medir, registrar_tamanho
+from vendas.snapshot import carregar_snapshot, salvar_snapshot
+
+# ====================================================================
+# FONTE DOS DADOS
+# ====================================================================
+TTL_SEGUNDOS = 600
+
+
+def carregar_dados_brutos(api_url):
+    cliente = ClienteLabdados(api_url)
+    try:
+        resposta = cliente.buscar()
+    finally:
+        cliente.fechar()
+    # cubo e coordenadas são montados uma única vez, junto com a carga
+    return montar_base(ler_dados(resposta.conteudo))
+
+
+# ====================================================================
+# REPOSITÓRIO ÚNICO POR PROCESSO
+# ====================================================================
+# Todas as sessões e páginas leem a mesma BaseVendas; ninguém altera os
+# frames dela. Depois da primeira carga, uma thread em segundo plano
+# revalida os dados antes de expirarem e troca a base inteira de uma vez
+# (uma única atribuição); enquanto isso, e se a atualização falhar, as
+# sessões continuam recebendo a versão anterior sem esperar pela API.
+ANTECEDENCIA = 0.8
+ESPERA_ERRO_SEGUNDOS = 30
+ESPERA_ERRO_MAXIMA = 300
+
+logger = logging.getLogger('dashboard_vendas.repositorio')
+
+
+class RepositorioVendas:
+    def __init__(self, api_url, ttl=TTL_SEGUNDOS, usar_snapshot=True, particionado=CARGA_PARTICIONADA):
+        self.api_url = api_url
+        self.ttl = ttl
+        self.usar_snapshot = usar_snapshot
+        self.particionado = particionado
+        self.cliente = ClienteLabdados(api_url)
+        self._lock = threading.Lock()
+        self._atualizando = threading.Lock()
+        self._base = None
+        self._metadados = {}
+        self._carregado_em = 0.0
+        self._falhas_seguidas = 0
+        self._parciais = 0
+        self._agendamento = None
+        self.ultimo_erro = None
+
+    @property
+    def carregado(self):
+        return self._base is not None
+
+    def _expirado(self):
+        return time.monotonic() - self._carregado_em >= self.ttl
+
+    def _atualizar(self):
+        # na partida, o snapshot em disco atende sem ir à rede
+        if self._base is None and self.usar_snapshot:
+            with medir('snapshot'):
+                carregado = carregar_snapshot()
+            if carregado is not None:
+                self._base, self._metadados = carregado
+                return 'snapshot'
+
+        buscar = self._buscar_particionado if self.particionado else self._buscar_inteiro
+        novo = buscar()
+        if novo is None:
+            return 'inalterado'
+        dados, metadados = novo
+
+        with medir('montar_base'):
+            nova_base = montar_base(dados)
+        self._metadados = metadados
+        # a versão é a impressão digital do frame normalizado inteiro, então
+        # só é igual quando nenhum valor mudou (por exemplo, o hash do corpo
+        # mudou só porque as partições vieram divididas de outro jeito)
+        if self._base is not None and nova_base.versao == self._base.versao:
+            return 'inalterado'
+        self._base = nova_base
+        if self.usar_snapshot:
+            salvar_snapshot(nova_base, self._metadados)
+        return 'atualizado'
+
+    def _buscar_inteiro(self):
+        # requisição condicional: 304 chega sem corpo quando nada mudou
+        with medir('fetch_http'):
+            resposta = self.cliente.buscar(
+                etag=self._metadados.get('etag'),
+                ultima_modificacao=self._metadados.get('ultima_modificacao'),
+            )
+        if resposta.nao_modificado:
+            return None
+        registrar_tamanho('resposta_api', len(resposta.conteudo))
+
+        # mesmo sem ETag, conteúdo idêntico não é processado de novo
+        hash_conteudo = hashlib.sha256(resposta.conteudo).hexdigest()
+        if self._base is not None and hash_conteudo == self._metadados.get('hash'):
+            return None
+
+        with medir('parse_json'):
+            dados = ler_dados(resposta.conteudo)
+        return dados, {
+            'hash': hash_conteudo,
+            'etag': resposta.etag or '',
+            'ultima_modificacao': resposta.ultima_modificacao or '',
+        }
+
+    def _buscar_particionado(self):
+        # a varredura inteira alcança o que as partições não cobrem
+        lista = particoes_da_base(self._base)
+        if lista is None or self._parciais >= VARREDURA_A_CADA:
+            self._parciais = 0
+            return self._buscar_inteiro()
+        self._parciais += 1
+        with medir('fetch_particionado'):
+            hash_conteudo, dados = buscar_particionado(self.cliente, lista)
+        if self._base is not None and hash_conteudo == self._metadados.get('hash'):
+            return None
+        return dados, {'hash': hash_conteudo, 'etag': '', 'ultima_modificacao': ''}
+
+    # ----------------------------------------------------------------
+    # atualização em segundo plano
+    # ----------------------------------------------------------------
+    def _agendar(self, atraso):
+        if self._agendamento is not None:
+            self._agendamento.cancel()
+        self._agendamento = threading.Timer(atraso, self._atualizar_em_segundo_plano)
+        self._agendamento.daemon = True
+        self._agendamento.start()
+
+    def _atualizar_em_segundo_plano(self):
+        if not self._atualizando.acquire(blocking=False):
+            return
+        try:
+            with medir('atualizacao_segundo_plano'):
+                resultado = self._atualizar()
+        except Exception as e:
+            # mantém a versão atual e tenta de novo com espera crescente
+            self._falhas_seguidas += 1
+            self.ultimo_erro = e
+            REGISTRO.incrementar('atualizacoes_total', resultado='erro')
+            logger.warning('Falha ao atualizar os dados, mantendo a versão atual: %s', e)
+            atraso = min(ESPERA_ERRO_SEGUNDOS * 2 ** (self._falhas_seguidas - 1), ESPERA_ERRO_MAXIMA)
+        else:
+            self._falhas_seguidas = 0
+            self.ultimo_erro = None
+            self._carregado_em = time.monotonic()
+            REGISTRO.incrementar('atualizacoes_total', resultado=resultado)
+            atraso = self.ttl * ANTECEDENCIA
+        finally:
+            self._atualizando.release()
+        self._agendar(atraso)
+
+    def obter(self):
+        base = self._base
+        if base is not None:
+            # se o agendamento parou por algum motivo, dispara sem bloquear
+            agendado = self._agendamento is not None and self._agendamento.is_alive()
+            if self._expirado() and not agendado and not self._atualizando.locked():
+                threading.Thread(target=self._atualizar_em_segundo_plano, daemon=True).start()
+            return base
+
+        # primeira carga: só uma thread baixa os dados; as demais esperam
+        with self._lock:
+            if self._base is None:
+                resultado = self._atualizar()
+                self._carregado_em = time.monotonic()
+                # vindo do snapshot, revalida logo com a API, sem bloquear ninguém
+                self._agendar(0 if resultado == 'snapshot' else self.ttl * ANTECEDENCIA)
+            return self._base
+
+
+@st.cache_resource(show_spinner=False)
+def obter_repositorio(api_url=URL_LABDADOS):
+    return RepositorioVendas(api_url)
@@ -0,0 +1,132 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from vendas.filtros import estados_da_regiao
+
+# ====================================================================
+# SERVIDOR LOCAL  substituto da API labdados para testes e medições
+# ====================================================================
+# Responde em /produtos com os mesmos parâmetros 'regiao' e 'ano' da API,
+# envia ETag/Last-Modified, responde 304 a requisições condicionais e pode
+# simular latência e falhas (503) nas primeiras chamadas.
+class ServidorLabdados:
+    def __init__(self, registros, porta=0, latencia=0.0, falhas=0):
+        self.registros = registros
+        self.latencia = latencia
+        self.falhas = falhas
+        self.requisicoes = 0
+        self.ultima_modificacao = formatdate(usegmt=True)
+        self._lock = threading.Lock()
+        self._respostas = {}
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', porta), self._criar_handler())
+        self._servidor.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, porta = self._servidor.server_address[:2]
+        return f'http://{host}:{porta}/produtos'
+
+    def _corpo(self, regiao, ano):
+        chave = (regiao, ano)
+        if chave not in self._respostas:
+            estados = estados_da_regiao(regiao)
+            anos = {a for a in ano.split(',') if a}
+            selecionados = [
+                r for r in self.registros
+                if (estados is None or r['Local da compra'] in estados)
+                and (not anos or r['Data da Compra'][-4:] in anos)
+            ]
+            corpo = json.dumps(selecionados, ensure_ascii=False).encode('utf-8')
+            self._respostas[chave] = (corpo, f'"{hashlib.sha1(corpo).hexdigest()}"')
+        return self._respostas[chave]
+
+    def _criar_handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.rstrip('/') != '/produtos':
+                    self.send_error(404)
+                    return
+
+                with servidor._lock:
+                    servidor.requisicoes += 1
+                    falhar = servidor.falhas > 0
+                    if falhar:
+                        servidor.falhas -= 1
+                if servidor.latencia:
+                    time.sleep(servidor.latencia)
+                if falhar:
+                    self.send_error(503)
+                    return
+
+                params = parse_qs(url.query)
+                regiao = params.get('regiao', [''])[0]
+                ano = params.get('ano', [''])[0]
+                with servidor._lock:
+                    corpo, etag = servidor._corpo(regiao, ano)
+
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', servidor.ultima_modificacao)
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor local que imita a API labdados.')
+    parser.add_argument('arquivo', help='JSON com a lista de vendas no formato da API')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--latencia', type=float, default=0.0, help='segundos de espera por requisição')
+    args = parser.parse_args()
+
+    with open(args.arquivo, encoding='utf-8') as f:
+        registros = json.load(f)
+
+    servidor = ServidorLabdados(registros, porta=args.porta, latencia=args.latencia)
+    print(f'Servindo {len(registros)} vendas em {servidor.url}')
+    print(f'Use LABDADOS_URL={servidor.url} streamlit run Dashboard.py')
+    try:
+        servidor._servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.parar()
+
+
+if __name__ == '__main__':
+    main()
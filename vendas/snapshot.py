@@ -0,0 +1,70 @@
+import json
+import os
+import shutil
+import warnings
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.ipc
+
+from vendas.base import montar_base_compacta
+
+# ====================================================================
+# SNAPSHOT EM DISCO  Arrow IPC lido por memory-map na partida
+# ====================================================================
+DIRETORIO_SNAPSHOT = Path(
+    os.environ.get('DASHBOARD_SNAPSHOT_DIR', Path(__file__).resolve().parent.parent / '.snapshot')
+)
+ARQUIVO_ATUAL = 'atual.json'
+TABELAS = ('dados', 'estados', 'cubo')
+
+
+def _gravar_tabela(df, caminho):
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(str(caminho), 'wb') as arquivo:
+        with pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+
+
+def _ler_tabela(caminho):
+    # memory-map: as páginas vêm do cache do SO e não são copiadas na leitura
+    origem = pa.memory_map(str(caminho), 'r')
+    tabela = pa.ipc.open_file(origem).read_all()
+    return tabela.to_pandas(split_blocks=True)
+
+
+def salvar_snapshot(base, metadados, diretorio=DIRETORIO_SNAPSHOT):
+    # cada versão fica na sua pasta; 'atual.json' só aponta para ela depois
+    # que todos os arquivos foram gravados, então a troca é atômica
+    try:
+        pasta = diretorio / f'v-{base.versao}'
+        pasta.mkdir(parents=True, exist_ok=True)
+        for nome in TABELAS:
+            _gravar_tabela(getattr(base, nome), pasta / f'{nome}.arrow')
+
+        atual = dict(metadados, pasta=pasta.name, versao=base.versao, memoria=base.memoria)
+        temporario = diretorio / f'{ARQUIVO_ATUAL}.tmp'
+        temporario.write_text(json.dumps(atual), encoding='utf-8')
+        os.replace(temporario, diretorio / ARQUIVO_ATUAL)
+
+        for antiga in diretorio.glob('v-*'):
+            if antiga != pasta:
+                shutil.rmtree(antiga, ignore_errors=True)
+    except OSError as e:
+        # sem disco gravável o dashboard continua funcionando, só sem snapshot
+        warnings.warn(f'Não foi possível salvar o snapshot: {e}')
+
+
+def carregar_snapshot(diretorio=DIRETORIO_SNAPSHOT):
+    try:
+        metadados = json.loads((diretorio / ARQUIVO_ATUAL).read_text(encoding='utf-8'))
+        pasta = diretorio / metadados['pasta']
+        dados, estados, cubo = (_ler_tabela(pasta / f'{nome}.arrow') for nome in TABELAS)
+    except FileNotFoundError:
+        return None
+    except (OSError, KeyError, ValueError, pa.ArrowException) as e:
+        warnings.warn(f'Snapshot ignorado: {e}')
+        return None
+
+    base = montar_base_compacta(dados, estados, metadados['memoria'], cubo)
+    return base, metadados
@@ -0,0 +1,60 @@
+import streamlit as st
+
+from vendas.cache import em_cache, orcamento_ambiente
+from vendas.normalizacao import COLUNAS_COORDENADAS, anexar_coordenadas
+from vendas.paginacao import (
+    TAMANHOS_PAGINA, fatiar_pagina, ordem_por_coluna, restringir_ordem, total_paginas,
+)
+
+SEM_ORDEM = '(ordem original)'
+
+
+# A ordenação da base inteira é feita uma vez por versão e coluna e
+# reaproveitada por todas as sessões; filtros só restringem essa ordem. As
+# ordens ficam no orçamento em bytes de vendas.cache: as de versões antigas
+# saem primeiro. Uma ordem pode ocupar até metade do orçamento, senão a base
+# grande seria reordenada a cada rerun. Cada ordem tem 4 bytes por linha
+# (cerca de 38 MB com 10 milhões de linhas): o padrão guarda seis.
+@em_cache('ordens', orcamento_ambiente('DASHBOARD_CACHE_ORDENS_MB', 256), fracao_maxima=2)
+def ordem_em_cache(_dados, versao, coluna, ascendente):
+    return ordem_por_coluna(_dados, coluna, ascendente)
+
+
+# ====================================================================
+# TABELA PAGINADA  só a página visível vai para o navegador
+# ====================================================================
+def tabela_paginada(dados, chave, versao, linhas=None, colunas=None, estados=None):
+    colunas = colunas or list(dados.columns)
+    quantidade = len(dados) if linhas is None else len(linhas)
+
+    c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
+    with c1:
+        coluna_ordem = st.selectbox(
+            'Ordenar por', [SEM_ORDEM] + [c for c in colunas if c in dados.columns], key=f'{chave}_ordem'
+        )
+    with c2:
+        ascendente = st.toggle('Crescente', value=True, key=f'{chave}_crescente')
+    with c3:
+        tamanho = st.selectbox('Linhas por página', TAMANHOS_PAGINA, index=1, key=f'{chave}_tamanho')
+    with c4:
+        paginas = total_paginas(quantidade, tamanho)
+        # sem max_value: se o filtro reduzir as páginas, o número é ajustado aqui
+        numero = min(st.number_input('Página', min_value=1, value=1, key=f'{chave}_pagina'), paginas)
+
+    if coluna_ordem == SEM_ORDEM:
+        posicoes = linhas
+    else:
+        posicoes = ordem_em_cache(dados, versao, coluna_ordem, ascendente)
+        if linhas is not None:
+            posicoes = restringir_ordem(posicoes, linhas, len(dados))
+
+    pagina = fatiar_pagina(dados, posicoes, tamanho, numero)
+    if estados is not None and any(c in COLUNAS_COORDENADAS for c in colunas):
+        pagina = anexar_coordenadas(pagina, estados)
+    st.dataframe(pagina[colunas], width='stretch', hide_index=True)
+
+    inicio = (numero - 1) * tamanho
+    st.caption(
+        f'Linhas {min(inicio + 1, quantidade)}–{min(inicio + tamanho, quantidade)} de {quantidade} '
+        f'· página {numero} de {paginas}'
+    )